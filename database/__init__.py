@@ -1 +1 @@
-from .database import Base, Database
+from .database import Base, Database, insert_rows
\ No newline at end of file
@@ -1,12 +1,30 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, func, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from threading import Lock
-from contextlib import contextmanager
+from contextlib import contextmanager, asynccontextmanager
 
 Base = declarative_base()
 
+
+def insert_rows(table, rows: list):
+    """
+    INSERT of many rows as one statement with one array parameter per column:
+        INSERT INTO table (a, b) SELECT unnest(:a), unnest(:b)
+    One round trip instead of one statement per row with executemany, and the SQL does not depend
+    on the number of rows, so it is compiled once.
+    """
+    columns = list(rows[0])
+    arrays = [
+        func.unnest(bindparam(name, [row[name] for row in rows], type_=ARRAY(table.c[name].type)))
+        for name in columns
+    ]
+    return insert(table).from_select(columns, select(*arrays))
+
+
 class Database:
     '''
     Class for managing database connections
@@ -32,8 +50,9 @@ class Database:
         port = os.getenv("DB_PORT")
         dbname = os.getenv("DB_NAME")
 
+        url = f"postgresql+psycopg://{user}:{password}@{host}:{port}/{dbname}"
         self.engine = create_engine(
-            f"postgresql+psycopg://{user}:{password}@{host}:{port}/{dbname}",
+            url,
             echo=False,
             pool_size=5,
             max_overflow=10
@@ -41,14 +60,43 @@ class Database:
 
         self.SessionLocal = sessionmaker(bind=self.engine, expire_on_commit=False)
 
+        # Same database through psycopg's async driver, for code running on the event loop.
+        # No connection is opened until the first async session is used.
+        self.async_engine = create_async_engine(
+            url,
+            echo=False,
+            pool_size=5,
+            max_overflow=10
+        )
+
+        self.AsyncSessionLocal = async_sessionmaker(bind=self.async_engine, expire_on_commit=False)
+
+    @staticmethod
+    def _create_tables(connection):
+        Base.metadata.create_all(connection)
+        # create_all does not add new indexes to tables that already exist
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
     def get_session(self):
         # Get a database session, ensuring tables are created first
         if not Database._tables_created:
-            Base.metadata.create_all(self.engine)
+            with self.engine.begin() as connection:
+                self._create_tables(connection)
             Database._tables_created = True
             print("Tables created/verified successfully!")
         return self.SessionLocal()
 
+    async def get_async_session(self):
+        # Get an async database session, ensuring tables are created first
+        if not Database._tables_created:
+            async with self.async_engine.begin() as connection:
+                await connection.run_sync(self._create_tables)
+            Database._tables_created = True
+            print("Tables created/verified successfully!")
+        return self.AsyncSessionLocal()
+
     @contextmanager
     def session(self):
         """
@@ -63,4 +111,19 @@ class Database:
             session.rollback()
             raise
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    @asynccontextmanager
+    async def async_session(self):
+        """
+        Async version of session(): commits if successful, rolls back on exception, always closes.
+        """
+        session = await self.get_async_session()
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
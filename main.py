@@ -1,22 +1,108 @@
+from database import Database
 from menu.menu import Menu
 from repository.transactionRepository import TransactionRepository
 from repository.websiteRepository import WebsiteRepository
+from repository.snapshotRepository import SnapshotRepository
 from service.scraperService import ScraperService
 from service.websiteService import WebsiteService
 from service.miningService import MiningService
+from service.pipelineService import PipelineService
+from service.fetchScheduler import FetchScheduler
 
 
+import argparse
 import asyncio
+import os
+import sys
 
-async def main():
+def parseArguments():
+    parser = argparse.ArgumentParser(description="Bershka crawler and scraper")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Number of product pages fetched at the same time")
+    parser.add_argument("--per-host-concurrency", type=int, default=4,
+                        help="Maximum number of concurrent fetches against the same host")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 4,
+                        help="Number of workers used to parse the fetched HTML")
+    parser.add_argument("--parse-mode", choices=["process", "thread"], default="process",
+                        help="Parse the fetched HTML in worker processes or in worker threads")
+    # psycopg's async driver cannot run on the Proactor event loop that asyncio uses by default on Windows
+    parser.add_argument("--db-mode", choices=["async", "thread"],
+                        default="thread" if sys.platform == "win32" else "async",
+                        help="Write the scraped products through the async database engine on the event loop, "
+                             "or with the sync engine in worker threads (the default on Windows)")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Number of products written to the database in one batch")
+    parser.add_argument("--flush-interval", type=float, default=2.0,
+                        help="Write a partial batch once its oldest product waited this many seconds")
+    parser.add_argument("--browser-tabs", type=int, default=4,
+                        help="Number of pages the shared headless browser keeps open at the same time")
+    parser.add_argument("--recycle-after", type=int, default=200,
+                        help="Restart the headless browser after this many fetches")
+    parser.add_argument("--crawl-workers", type=int, default=1,
+                        help="Number of Selenium drivers crawling the website in parallel")
+    parser.add_argument("--crawl-order", choices=["dfs", "bfs", "priority"], default="dfs",
+                        help="Order in which discovered pages are crawled (priority = product pages first)")
+    parser.add_argument("--discovery", choices=["crawl", "sitemap"], default="crawl",
+                        help="Find the product pages by crawling the website, or from robots.txt and the sitemaps")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="Crawl the server HTML over plain HTTP instead of rendering pages in Chrome")
+    parser.add_argument("--reset", choices=["truncate", "delete", "website"], default="truncate",
+                        help="How option 1 empties the database: one TRUNCATE of every table, a DELETE per table, "
+                             "or only the rows of the crawled website")
+    parser.add_argument("--resume", action="store_true",
+                        help="Resume the last interrupted crawl from crawl_state.sqlite instead of starting over")
+    parser.add_argument("--fetch-mode", choices=["browser", "http"], default="browser",
+                        help="Render every product page in the browser, or fetch the server HTML over HTTP "
+                             "and fall back to the browser when the product data is missing")
+    parser.add_argument("--rate-per-host", type=float, default=4.0,
+                        help="Average number of requests per second sent to one host (crawler and scraper together)")
+    parser.add_argument("--burst", type=int, default=8,
+                        help="Number of requests that can be sent to one host at once before the rate limit applies")
+    parser.add_argument("--max-retries", type=int, default=4,
+                        help="Retries of a fetch that failed with 429/5xx/timeout, with exponential backoff")
+    parser.add_argument("--archive-dir", default="html_archive",
+                        help="Directory of the compressed archive of fetched pages (empty string disables it)")
+    parser.add_argument("--reparse", action="store_true",
+                        help="Re-parse the archived HTML, reload the products and exit (no crawling)")
+    return parser.parse_args()
+
+async def main(args):
+    # Shared by the crawler and the scraper, so it is configured before them
+    FetchScheduler(rate=args.rate_per_host, burst=args.burst, max_retries=args.max_retries)
     websiteRepository = WebsiteRepository()
     transactionRepository = TransactionRepository()
-    websiteService = WebsiteService(websiteRepository)
-    scraperService = ScraperService()
+    websiteService = WebsiteService(websiteRepository, SnapshotRepository())
+    scraperService = ScraperService(
+        max_tabs=args.browser_tabs,
+        recycle_after=args.recycle_after,
+        archive_path=args.archive_dir,
+        fetch_mode=args.fetch_mode,
+        http_connections=args.concurrency
+    )
     miningService = MiningService(transactionRepository)
+    pipelineService = PipelineService(
+        websiteService,
+        scraperService,
+        concurrency=args.concurrency,
+        per_host_concurrency=args.per_host_concurrency,
+        parse_workers=args.parse_workers,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        parse_mode=args.parse_mode,
+        db_mode=args.db_mode
+    )
 
-    menu = Menu(websiteService, scraperService, miningService)
-    await menu.printMenu()
+    menu = Menu(websiteService, scraperService, miningService, pipelineService, settings=args)
+    try:
+        if args.reparse:
+            await menu.reparseArchive()
+        else:
+            await menu.printMenu()
+    finally:
+        await scraperService.close()
+        pipelineService.close()
+        # Close the async connections while the event loop is still running
+        await Database().async_engine.dispose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(parseArguments()))
@@ -1,9 +1,11 @@
 import asyncio
 
-from model import Website, CrawledUrl
+from model import Website
 from service.crawlerService import CrawlerService
 from service.miningService import MiningService
+from service.pipelineService import PipelineService
 from service.scraperService import ScraperService
+from service.sitemapService import SitemapService
 from service.websiteService import WebsiteService
 
 class Menu:
@@ -14,15 +16,129 @@ class Menu:
             cls._instance = super(Menu, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self, websiteService: WebsiteService, scraperService: ScraperService, miningService: MiningService):
+    def __init__(self, websiteService: WebsiteService, scraperService: ScraperService, miningService: MiningService,
+                 pipelineService: PipelineService, settings=None):
         if hasattr(self, "_initialized") and self._initialized:
             return
 
         self.__websiteService = websiteService
         self.__scraperService = scraperService
         self.__miningService = miningService
+        self.__pipelineService = pipelineService
+        # Command line settings (see main.parseArguments)
+        self.__settings = settings
         self._initialized = True
 
+    def __getSetting(self, name, default):
+        return getattr(self.__settings, name, default)
+
+    async def __crawlAndScrape(self, incremental: bool):
+        websiteUrl = "https://www.bershka.com/ro/"
+
+        if incremental:
+            # Keep the stored products, only the changed ones are replaced
+            website = self.__websiteService.getWebsiteByName(websiteUrl)
+            if website is None:
+                self.__websiteService.createWebsite(Website(website_name=websiteUrl))
+        else:
+            reset = self.__getSetting("reset", "truncate")
+            if reset == "website":
+                # Delete only this website's products and crawled URLs
+                website = self.__websiteService.getWebsiteByName(websiteUrl)
+                if website is not None:
+                    self.__websiteService.purgeWebsite(website.id)
+            else:
+                # Delete every entry into the database
+                self.__websiteService.deleteEverythingFromDatabase(truncate=reset == "truncate")
+
+            website = Website(website_name=websiteUrl)
+
+            # Create website
+            self.__websiteService.createWebsite(website)
+
+        website_id = self.__websiteService.getWebsiteByName(websiteUrl).id
+
+        # Number of pages that you want to crawl. Maybe make it to be given as input?
+        max_pages = 25
+
+        # Product pages found by the discovery thread are handed to the scraper as they are reached,
+        # so scraping starts while the website is still being crawled
+        loop = asyncio.get_running_loop()
+        product_urls = asyncio.Queue()
+
+        def on_product_url(url):
+            loop.call_soon_threadsafe(product_urls.put_nowait, url)
+
+        if self.__getSetting("discovery", "crawl") == "sitemap":
+            # The whole catalog from robots.txt and the sitemaps, without rendering any page
+            discoveryService = SitemapService()
+            crawl = asyncio.ensure_future(asyncio.to_thread(
+                discoveryService.discover,
+                websiteUrl,
+                True,
+                on_product_url=on_product_url
+            ))
+        else:
+            discoveryService = CrawlerService(use_browser=not self.__getSetting("no_browser", False))
+            crawl = asyncio.ensure_future(asyncio.to_thread(
+                discoveryService.crawl_website,
+                websiteUrl,
+                max_pages,
+                True,
+                self.__getSetting("crawl_workers", 1),
+                self.__getSetting("crawl_order", "dfs"),
+                self.__getSetting("resume", False),
+                on_product_url=on_product_url
+            ))
+        crawl.add_done_callback(lambda _: product_urls.put_nowait(None))
+
+        async def crawled_product_urls():
+            while (url := await product_urls.get()) is not None:
+                yield url
+            # A crawl that failed must fail the run before the pipeline removes the products it did not see
+            crawl.result()
+
+        print(f"Scraping the products with {self.__pipelineService.concurrency} concurrent fetches while crawling")
+
+        # Fetch, parse and persist the products concurrently
+        try:
+            # Stored products that were not found are only removed if discovery covered the whole catalog,
+            # a crawl stopped by max_pages only saw part of it
+            stats = await self.__pipelineService.run(
+                crawled_product_urls(), website_id, incremental=incremental,
+                remove_missing=lambda: crawl.result()['complete']
+            )
+            results = await crawl
+        finally:
+            await asyncio.gather(crawl, return_exceptions=True)
+            discoveryService.close()
+
+        if incremental:
+            print(f"Unchanged: {stats['unchanged']}, updated: {stats['updated']}, "
+                  f"new: {stats['new']}, removed: {stats['removed']}")
+            if not results['complete']:
+                print("Discovery did not cover the whole catalog, no stored product was removed")
+
+        '''
+        if results:
+            print("\nResults returned successfully!")
+            print(f"Total filtered URLs: {results['categorization']['total']}")
+            print(f"Product URLs: {results['categorization']['product_count']}")
+            print(f"Category URLs: {results['categorization']['category_count']}")
+        '''
+
+    async def reparseArchive(self):
+        # Parse the archived product pages again and reload the products, without crawling
+        websiteUrl = "https://www.bershka.com/ro/"
+
+        website = self.__websiteService.getWebsiteByName(websiteUrl)
+        if website is None:
+            print("Nu exista produse extrase anterior, rulati mai intai crawler-ul (optiunea 1)\n")
+            return None
+
+        stats = await self.__pipelineService.reparseArchive(website.id)
+        print(f"Unchanged: {stats['unchanged']}, updated: {stats['updated']}, new: {stats['new']}\n")
+
     async def printMenu(self):
         while True:
             print(
@@ -30,79 +146,16 @@ class Menu:
             print("2. Scrape URL")
             print("3. Tehnica de data mining 1")
             print("4. Regression")
-            print("5. Exit\n")
+            print("5. Exit")
+            print("6. Ruleaza crawler incremental pe Bershka (se pastreaza produsele, se actualizeaza doar cele modificate)")
+            print("7. Re-parseaza paginile HTML arhivate si reincarca produsele (fara crawling)\n")
 
             option = int(await asyncio.to_thread(input, "Alegeti optiunea: "))
             print()
 
             if option == 1:
                 try:
-                    # Delete every entry into the database
-                    self.__websiteService.deleteEverythingFromDatabase()
-
-                    websiteUrl = "https://www.bershka.com/ro/"
-                    website = Website(website_name=websiteUrl)
-
-                    # Create website
-                    self.__websiteService.createWebsite(website)
-                    website_id = self.__websiteService.getWebsiteByName(websiteUrl).id
-
-                    # Number of pages that you want to crawl. Maybe make it to be given as input?
-                    max_pages = 25
-
-                    crawlerService = CrawlerService()
-
-                    # Crawl website
-                    results = await asyncio.to_thread(
-                        crawlerService.crawl_website,
-                        websiteUrl,
-                        max_pages,
-                        True
-                    )
-                    crawlerService.close()
-
-                    # Read every crawled url for products
-                    lines = await asyncio.to_thread(
-                        lambda: open("product_urls.txt", "r", encoding="utf-8").read().splitlines()
-                    )
-
-                    total_products = len(lines)
-
-                    for i, line in enumerate(lines, start=1):
-                        line_url = line.strip()
-                        if not line_url:
-                            continue
-
-                        print(f"Scraping product {i} out of {total_products}")
-
-                        # Create CrawledUrl entity and persist it
-                        crawled_url = CrawledUrl(
-                            crawled_url_address=line_url,
-                            website_id=website_id
-                        )
-                        self.__websiteService.addCrawledWebsiteUrl(crawled_url)
-
-                        # Scrape the url to get the data
-                        scraped_product_from_url = await self.__scraperService.scrapeURL(line_url)
-
-                        # Create product with scraped data for the website
-                        result = await asyncio.to_thread(
-                            self.__scraperService.createProductWithScrapedData,
-                            scraped_product_from_url,
-                            website_id
-                        )
-
-                        # Persist the created product
-                        self.__websiteService.addProduct(result)
-
-                    '''
-                    if results:
-                        print("\nResults returned successfully!")
-                        print(f"Total filtered URLs: {results['categorization']['total']}")
-                        print(f"Product URLs: {results['categorization']['product_count']}")
-                        print(f"Category URLs: {results['categorization']['category_count']}")
-                    '''
-
+                    await self.__crawlAndScrape(incremental=False)
                 except Exception as e:
                     print(f"Error in main: {e}")
                     return None
@@ -131,4 +184,16 @@ class Menu:
                 print(result, "\n")
 
             elif option == 5:
-                exit(0)
\ No newline at end of file
+                exit(0)
+
+            elif option == 6:
+                try:
+                    await self.__crawlAndScrape(incremental=True)
+                except Exception as e:
+                    print(f"Error in main: {e}")
+
+            elif option == 7:
+                try:
+                    await self.reparseArchive()
+                except Exception as e:
+                    print(f"Error in main: {e}")
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, Column, Table
+from sqlalchemy import ForeignKey, Integer, Column, Table, Index
 
 from database import Base
 from .product import Product
@@ -9,12 +9,15 @@ from .productImage import ProductImage
 from .crawledUrl import CrawledUrl
 from .material import Material
 from .product_material import ProductMaterial
+from .productSnapshot import ProductSnapshot
 
 product_colors_table = Table(
     "products_colors",
     Base.metadata,
     Column("product_id", Integer, ForeignKey("product.id"), primary_key=True),
     Column("color_id", Integer, ForeignKey("color.id"), primary_key=True),
+    # The primary key covers lookups by product, this one the lookups by color
+    Index("ix_products_colors_color_id", "color_id"),
 )
 
 product_origins_table = Table(
@@ -22,4 +25,5 @@ product_origins_table = Table(
     Base.metadata,
     Column("product_id", Integer, ForeignKey("product.id"), primary_key=True),
     Column("origin_id", Integer, ForeignKey("origin.id"), primary_key=True),
+    Index("ix_products_origins_origin_id", "origin_id"),
 )
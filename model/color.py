@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database.database import Base
 
 class Color(Base):
     __tablename__ = "color"
+    __table_args__ = (
+        # One row per color, shared by every product that has it
+        UniqueConstraint("color_id", "name", name="uq_color_natural_key", postgresql_nulls_not_distinct=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     color_id = Column(String)
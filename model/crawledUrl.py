@@ -9,5 +9,5 @@ class CrawledUrl(Base):
     crawled_url_address = Column(String, nullable=False, unique=True) # Crawled URL should be unique name is unique
 
     # many-to-one
-    website_id = Column(Integer, ForeignKey("website.id"))
+    website_id = Column(Integer, ForeignKey("website.id"), index=True)
     website = relationship("Website", back_populates="crawled_urls")
@@ -1,15 +1,23 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 
 class Material(Base):
     __tablename__ = "material"
+    __table_args__ = (
+        # One row per material, shared by every product made of it
+        UniqueConstraint(
+            "name", "certification", "is_certified",
+            name="uq_material_natural_key",
+            postgresql_nulls_not_distinct=True
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
     name = Column(String, nullable=False)
     certification = Column(String, nullable=True)
-    is_certified = Column(Boolean, default=False)
+    is_certified = Column(Boolean, nullable=False, default=False)
 
     products = relationship(
         "ProductMaterial",
@@ -6,7 +6,7 @@ class Origin(Base):
     __tablename__ = "origin"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True) # One row per origin, shared by every product
 
     products = relationship(
         "Product",
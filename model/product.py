@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from database.database import Base
 
 class Product(Base):
     __tablename__ = "product"
+    __table_args__ = (
+        # Natural key used by the upsert ingestion
+        UniqueConstraint("website_id", "product_key", name="uq_product_website_key"),
+        # Products of a website by URL (dedup), also serves the website_id FK
+        Index("ix_product_website_url", "website_id", "product_url"),
+        # In-stock products of a website, by price
+        Index(
+            "ix_product_in_stock",
+            "website_id", "product_price",
+            postgresql_where=text("product_in_stock = 'in_stock'")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True) # PK, Strategy: autoincrement
     product_name = Column(String, nullable=False)
@@ -11,8 +23,8 @@ class Product(Base):
     product_url = Column(String)
     product_main_image = Column(String)
     product_price = Column(Float, nullable=False)
-    product_sku = Column(String)
-    product_reference = Column(String)
+    product_sku = Column(String, index=True)
+    product_reference = Column(String, index=True)
     product_display_reference = Column(String)
     product_in_stock = Column(String)
     product_reference_text = Column(String)
@@ -20,6 +32,8 @@ class Product(Base):
     product_model_size = Column(String)
     product_model_name = Column(String)
     product_extra_info = Column(String)
+    product_content_hash = Column(String) # Hash of the scraped payload, used by the incremental re-crawl
+    product_key = Column(String) # Natural key within the website: reference, else SKU, else URL
 
     # many-to-one
     website_id = Column(Integer, ForeignKey("website.id"))
@@ -9,5 +9,5 @@ class ProductImage(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     image_url = Column(String, nullable=False)
 
-    product_id = Column(Integer, ForeignKey("product.id"))
+    product_id = Column(Integer, ForeignKey("product.id"), index=True)
     product = relationship("Product", back_populates="images")
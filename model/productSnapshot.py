@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Float, DateTime, PrimaryKeyConstraint
+from database.database import Base
+
+
+class ProductSnapshot(Base):
+    '''
+    Append-only price and stock history, one row per product per run in which they changed.
+    A column is NULL when its value did not change since the previous row of the product.
+
+    Partitioned by month on captured_at, the partitions are created on demand by SnapshotRepository.
+    Keyed by the website name and the product natural key instead of foreign keys, so the history
+    survives the catalog being emptied and reloaded with new ids.
+    '''
+    __tablename__ = "product_snapshot"
+    __table_args__ = (
+        # The partition key has to be part of the primary key
+        PrimaryKeyConstraint("website_name", "product_key", "captured_at"),
+        {
+            "postgresql_partition_by": "RANGE (captured_at)",
+            # Not emptied by WebsiteRepository.deleteEverythingFromDatabase
+            "info": {"keep_on_reset": True},
+        },
+    )
+
+    website_name = Column(String, nullable=False)
+    product_key = Column(String, nullable=False)
+    captured_at = Column(DateTime(timezone=True), nullable=False)
+    price = Column(Float)
+    in_stock = Column(String)
@@ -7,8 +7,8 @@ class ProductMaterial(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
-    product_id = Column(Integer, ForeignKey("product.id"), nullable=False)
-    material_id = Column(Integer, ForeignKey("material.id"), nullable=False)
+    product_id = Column(Integer, ForeignKey("product.id"), nullable=False, index=True)
+    material_id = Column(Integer, ForeignKey("material.id"), nullable=False, index=True)
 
     percentage = Column(Integer, nullable=False)
     area = Column(String, nullable=True)
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from threading import Lock
+
+from sqlalchemy import select
+
+from database import Database, insert_rows
+from model import Color, Origin, Material
+
+
+class _LruCache:
+    # Bounded natural key -> id mapping, the least recently used keys are evicted first
+    def __init__(self, maxSize: int):
+        self.maxSize = maxSize
+        self.__items = OrderedDict()
+        self.__lock = Lock()
+
+    def get(self, key):
+        with self.__lock:
+            value = self.__items.get(key)
+            if value is not None:
+                self.__items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.maxSize:
+                self.__items.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__items.clear()
+
+
+class DimensionRepository:
+    '''
+    Get-or-create access to the color, origin and material dimension tables.
+    Rows are unique on their natural key, and resolved ids are kept in a bounded
+    in-process cache so bulk scraping does not need a DB round trip per lookup.
+    '''
+    _instance = None
+
+    # table -> natural key columns
+    NATURAL_KEYS = {
+        Color.__table__: ("color_id", "name"),
+        Origin.__table__: ("name",),
+        Material.__table__: ("name", "certification", "is_certified"),
+    }
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(DimensionRepository, cls).__new__(cls)
+        return cls._instance
+
+
+    def __init__(self, cacheSize: int = 10000):
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+
+        self.__db = Database()
+        self.__caches = {table: _LruCache(cacheSize) for table in self.NATURAL_KEYS}
+        self._initialized = True
+
+
+    def clearCache(self)->None:
+        # Must be called when the dimension tables are emptied
+        for cache in self.__caches.values():
+            cache.clear()
+
+
+    def colorIds(self, keys: list)->list:
+        # keys: (color_id, name) tuples
+        return self.__resolveIds(Color.__table__, keys)
+
+
+    def originIds(self, keys: list)->list:
+        # keys: (name,) tuples
+        return self.__resolveIds(Origin.__table__, keys)
+
+
+    def materialIds(self, keys: list)->list:
+        # keys: (name, certification, is_certified) tuples
+        return self.__resolveIds(Material.__table__, keys)
+
+
+    async def colorIdsAsync(self, keys: list)->list:
+        return await self.__resolveIdsAsync(Color.__table__, keys)
+
+
+    async def originIdsAsync(self, keys: list)->list:
+        return await self.__resolveIdsAsync(Origin.__table__, keys)
+
+
+    async def materialIdsAsync(self, keys: list)->list:
+        return await self.__resolveIdsAsync(Material.__table__, keys)
+
+
+    def __resolveIds(self, table, keys: list)->list:
+        """
+        Return the id of every natural key, in order, creating the missing rows.
+        Runs in its own committed transaction, so the cached ids never point to rolled back rows.
+        """
+        resolved, missing = self.__lookupCache(table, keys)
+        if missing:
+            with self.__db.session() as session:
+                self.__fetchIds(session, table, missing, resolved)
+        return [resolved[key] for key in keys]
+
+
+    async def __resolveIdsAsync(self, table, keys: list)->list:
+        # Same as __resolveIds, on the async engine
+        resolved, missing = self.__lookupCache(table, keys)
+        if missing:
+            async with self.__db.async_session() as session:
+                await session.run_sync(self.__fetchIds, table, missing, resolved)
+        return [resolved[key] for key in keys]
+
+
+    def __lookupCache(self, table, keys: list)->tuple:
+        # (key -> cached id, keys missing from the cache)
+        cache = self.__caches[table]
+        resolved = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            cached_id = cache.get(key)
+            if cached_id is None:
+                missing.append(key)
+            else:
+                resolved[key] = cached_id
+        return resolved, missing
+
+
+    def __fetchIds(self, session, table, missing: list, resolved: dict)->None:
+        # Create the missing rows and add their ids to resolved and to the cache
+        cache = self.__caches[table]
+        columns = self.NATURAL_KEYS[table]
+        session.execute(insert_rows(table, [dict(zip(columns, key)) for key in missing]).on_conflict_do_nothing())
+
+        # NULLs are part of some keys, so match the rows in Python instead of with a tuple IN
+        wanted = set(missing)
+        first = table.c[columns[0]]
+        rows = session.execute(
+            select(table.c.id, *[table.c[column] for column in columns])
+            .where(first.in_({key[0] for key in missing}))
+        )
+        for row in rows:
+            key = tuple(row[1:])
+            if key in wanted:
+                resolved[key] = row[0]
+                cache.put(key, row[0])
@@ -0,0 +1,213 @@
+from datetime import datetime, timezone
+from threading import Lock
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import String
+
+from database import Database, insert_rows
+from model import ProductSnapshot
+
+
+def _month_bounds(moment: datetime) -> tuple:
+    # [first day of the month, first day of the next month) in UTC
+    moment = moment.astimezone(timezone.utc)
+    start = datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+    end = datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+class SnapshotRepository:
+    '''
+    Price and stock history of the products, stored in the append-only, month-partitioned
+    product_snapshot table. A row only holds the values that changed since the previous row
+    of its product, the queries carry the last known value forward.
+    '''
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(SnapshotRepository, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+
+        self.__db = Database()
+        # Months whose partition is known to exist
+        self.__partitions = set()
+        self.__lock = Lock()
+        self._initialized = True
+
+
+    def __ensurePartition(self, capturedAt: datetime)->None:
+        # The partition is created in its own transaction, and only cached once it is committed
+        start = _month_bounds(capturedAt)[0]
+        with self.__lock:
+            if start in self.__partitions:
+                return
+        with self.__db.engine.begin() as connection:
+            connection.execute(self.__partitionDdl(capturedAt))
+        with self.__lock:
+            self.__partitions.add(start)
+
+
+    async def __ensurePartitionAsync(self, capturedAt: datetime)->None:
+        start = _month_bounds(capturedAt)[0]
+        with self.__lock:
+            if start in self.__partitions:
+                return
+        async with self.__db.async_engine.begin() as connection:
+            await connection.execute(self.__partitionDdl(capturedAt))
+        with self.__lock:
+            self.__partitions.add(start)
+
+
+    @staticmethod
+    def __partitionDdl(capturedAt: datetime):
+        start, end = _month_bounds(capturedAt)
+        table = ProductSnapshot.__tablename__
+        return text(
+            f'CREATE TABLE IF NOT EXISTS "{table}_{start:%Y_%m}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+
+    def recordSnapshots(self, websiteName: str, products: list, capturedAt: datetime)->int:
+        """
+        Append a snapshot of the price and stock of the products, taken at capturedAt (the start of
+        the run, so a product gets at most one row per run). Products whose price and stock did not
+        change are skipped, and only the changed value is stored for the others.
+        Returns the number of rows written.
+        """
+        latest = self.__latestByKey(products)
+        if not latest:
+            return 0
+
+        rows = self.__changedRows(websiteName, latest, self.getSnapshotsAt(websiteName, list(latest)), capturedAt)
+        if rows:
+            self.__ensurePartition(capturedAt)
+            with self.__db.session() as session:
+                session.execute(self.__insertRows(rows))
+        return len(rows)
+
+
+    async def recordSnapshotsAsync(self, websiteName: str, products: list, capturedAt: datetime)->int:
+        # Same as recordSnapshots, on the async engine
+        latest = self.__latestByKey(products)
+        if not latest:
+            return 0
+
+        previous = await self.getSnapshotsAtAsync(websiteName, list(latest))
+        rows = self.__changedRows(websiteName, latest, previous, capturedAt)
+        if rows:
+            await self.__ensurePartitionAsync(capturedAt)
+            async with self.__db.async_session() as session:
+                await session.execute(self.__insertRows(rows))
+        return len(rows)
+
+
+    @staticmethod
+    def __latestByKey(products: list)->dict:
+        latest = {}
+        for product in products:
+            latest[product.product_key] = product
+        return latest
+
+
+    @staticmethod
+    def __changedRows(websiteName: str, latest: dict, previous: dict, capturedAt: datetime)->list:
+        rows = []
+        for productKey, product in latest.items():
+            lastPrice, lastInStock = previous.get(productKey, (None, None))
+            priceChanged = product.product_price != lastPrice
+            stockChanged = product.product_in_stock != lastInStock
+            if priceChanged or stockChanged:
+                rows.append({
+                    "website_name": websiteName,
+                    "product_key": productKey,
+                    "captured_at": capturedAt,
+                    "price": product.product_price if priceChanged else None,
+                    "in_stock": product.product_in_stock if stockChanged else None,
+                })
+        return rows
+
+
+    @staticmethod
+    def __insertRows(rows: list):
+        # A product already recorded in this run keeps its first row
+        return insert_rows(ProductSnapshot.__table__, rows).on_conflict_do_nothing()
+
+
+    def getSnapshotsAt(self, websiteName: str, productKeys: list, at: datetime = None)->dict:
+        """
+        product_key -> (price, in_stock) as they were at `at` (now by default), for the products
+        of productKeys that had a snapshot by then.
+        """
+        with self.__db.session() as session:
+            rows = session.execute(*self.__snapshotsQuery(websiteName, productKeys, at)).all()
+        return self.__snapshotsByKey(rows)
+
+
+    async def getSnapshotsAtAsync(self, websiteName: str, productKeys: list, at: datetime = None)->dict:
+        async with self.__db.async_session() as session:
+            rows = (await session.execute(*self.__snapshotsQuery(websiteName, productKeys, at))).all()
+        return self.__snapshotsByKey(rows)
+
+
+    @staticmethod
+    def __snapshotsQuery(websiteName: str, productKeys: list, at: datetime|None)->tuple:
+        timeFilter = "AND s.captured_at <= :at" if at is not None else ""
+        query = text(f"""
+            SELECT k.product_key,
+                (SELECT s.price FROM product_snapshot s
+                 WHERE s.website_name = :website AND s.product_key = k.product_key
+                   AND s.price IS NOT NULL {timeFilter}
+                 ORDER BY s.captured_at DESC LIMIT 1) AS price,
+                (SELECT s.in_stock FROM product_snapshot s
+                 WHERE s.website_name = :website AND s.product_key = k.product_key
+                   AND s.in_stock IS NOT NULL {timeFilter}
+                 ORDER BY s.captured_at DESC LIMIT 1) AS in_stock
+            FROM unnest(:keys) AS k(product_key)
+        """).bindparams(bindparam("keys", type_=ARRAY(String)))
+
+        params = {"website": websiteName, "keys": productKeys}
+        if at is not None:
+            params["at"] = at
+        return query, params
+
+
+    @staticmethod
+    def __snapshotsByKey(rows)->dict:
+        return {
+            productKey: (price, inStock)
+            for productKey, price, inStock in rows
+            if price is not None or inStock is not None
+        }
+
+
+    def getLatestPrice(self, websiteName: str, productKey: str)->float|None:
+        return self.getPriceAt(websiteName, productKey, None)
+
+
+    def getPriceAt(self, websiteName: str, productKey: str, at: datetime|None)->float|None:
+        # Price of a product at a point in time, None if it was not known yet
+        price, _ = self.getSnapshotsAt(websiteName, [productKey], at).get(productKey, (None, None))
+        return price
+
+
+    def getPriceHistory(self, websiteName: str, productKey: str)->list:
+        # (captured_at, price, in_stock) of every change of a product, oldest first, with both values filled in
+        with self.__db.session() as session:
+            rows = session.query(ProductSnapshot.captured_at, ProductSnapshot.price, ProductSnapshot.in_stock) \
+                .filter(ProductSnapshot.website_name == websiteName, ProductSnapshot.product_key == productKey) \
+                .order_by(ProductSnapshot.captured_at).all()
+
+        history = []
+        price, inStock = None, None
+        for capturedAt, rowPrice, rowInStock in rows:
+            price = rowPrice if rowPrice is not None else price
+            inStock = rowInStock if rowInStock is not None else inStock
+            history.append((capturedAt, price, inStock))
+        return history
@@ -3,6 +3,15 @@ from database import Database
 
 
 class TransactionRepository:
+    __regressionQuery = text("""
+        SELECT product_price as price,
+            product_name as name,
+            COALESCE(product_extra_info, '') as extra_info,
+            COALESCE(product_reference_text, '') as ref_info
+        FROM product
+        WHERE product_price IS NOT NULL
+    """)
+
     def __init__(self):
         self.__db = Database()
 
@@ -11,13 +20,10 @@ class TransactionRepository:
             Fetches data suitable for Price Prediction Regression
         """
         with self.__db.session() as session:
-            query = text("""
-                SELECT product_price as price,
-                    product_name as name,
-                    COALESCE(product_extra_info, '') as extra_info,
-                    COALESCE(product_reference_text, '') as ref_info
-                FROM product
-                WHERE product_price IS NOT NULL
-            """)
-            result = session.execute(query)
-            return [dict(row._mapping) for row in result.fetchall()]
\ No newline at end of file
+            result = session.execute(self.__regressionQuery)
+            return [dict(row._mapping) for row in result.fetchall()]
+
+    async def getRegressionDataAsync(self):
+        async with self.__db.async_session() as session:
+            result = await session.execute(self.__regressionQuery)
+            return [dict(row._mapping) for row in result.fetchall()]
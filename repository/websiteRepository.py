@@ -1,7 +1,10 @@
-from sqlalchemy import Integer
+from sqlalchemy import Integer, any_, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 
-from database import Database, Base
-from model import CrawledUrl
+from database import Database, Base, insert_rows
+from model import CrawledUrl, ProductImage, ProductMaterial
+from model import product_colors_table, product_origins_table
+from repository.dimensionRepository import DimensionRepository
 from model.product import Product
 from model.website import Website
 
@@ -20,14 +23,40 @@ class WebsiteRepository:
             return
 
         self.__db = Database()
+        self.__dimensions = DimensionRepository()
         self._initialized = True
 
 
-    def deleteEverythingFromDatabase(self):
+    def deleteEverythingFromDatabase(self, truncate: bool = True):
+        """
+        Empty every table. By default with a single TRUNCATE ... RESTART IDENTITY CASCADE, which drops
+        the data files instead of deleting row by row (no dead tuples, minimal WAL) and resets the ids.
+        truncate=False deletes table by table, for a role without the TRUNCATE privilege.
+        The price history (tables marked keep_on_reset) is kept.
+        """
+        tables = [table for table in Base.metadata.sorted_tables if not table.info.get("keep_on_reset")]
         with self.__db.session() as session:
-            for table in reversed(Base.metadata.sorted_tables):
-                session.execute(table.delete())
-            session.commit()
+            if truncate:
+                names = ", ".join(f'"{table.name}"' for table in tables)
+                session.execute(text(f"TRUNCATE TABLE {names} RESTART IDENTITY CASCADE"))
+            else:
+                for table in reversed(tables):
+                    session.execute(table.delete())
+        self.__dimensions.clearCache()
+
+
+    def purgeWebsite(self, websiteId: int)->None:
+        """
+        Delete one website with its products (and their colors, origins, materials and images) and its
+        crawled URLs, using one set-based DELETE per table. The shared color/origin/material rows are kept.
+        """
+        productIds = select(Product.id).where(Product.website_id == websiteId).scalar_subquery()
+        with self.__db.session() as session:
+            for child in (product_colors_table, product_origins_table, ProductMaterial.__table__, ProductImage.__table__):
+                session.execute(child.delete().where(child.c.product_id.in_(productIds)))
+            session.execute(Product.__table__.delete().where(Product.website_id == websiteId))
+            session.execute(CrawledUrl.__table__.delete().where(CrawledUrl.website_id == websiteId))
+            session.execute(Website.__table__.delete().where(Website.id == websiteId))
 
 
     def getWebsiteById(self, websiteId: Integer)->Website|None:
@@ -35,21 +64,270 @@ class WebsiteRepository:
             return session.query(Website).filter(Website.id == websiteId).first()
 
 
+    async def getWebsiteByIdAsync(self, websiteId: int)->Website|None:
+        async with self.__db.async_session() as session:
+            return await session.get(Website, websiteId)
+
+
     def getWebsiteByName(self, websiteName: str)->Website|None:
         with self.__db.session() as session:
             return session.query(Website).filter(Website.website_name == websiteName).first()
 
 
+    async def getWebsiteByNameAsync(self, websiteName: str)->Website|None:
+        async with self.__db.async_session() as session:
+            return await session.scalar(select(Website).where(Website.website_name == websiteName))
+
+
     def createWebsite(self, website: Website)->None:
         with self.__db.session() as session:
             session.add(website)
 
 
     def addProduct(self, product: Product)->None:
+        # Same path as the bulk insert, so colors, origins and materials are shared rows
         with self.__db.session() as session:
-            session.add(product)
+            self.__insertProductBatch(session, [product])
 
 
     def addCrawledWebsiteUrl(self, crawledUrl: CrawledUrl)->None:
         with self.__db.session() as session:
-            session.add(crawledUrl)
\ No newline at end of file
+            session.add(crawledUrl)
+
+
+    def bulkAddCrawledWebsiteUrls(self, crawledUrls: list)->None:
+        if not crawledUrls:
+            return
+        with self.__db.session() as session:
+            session.execute(self.__crawledUrlsInsert(crawledUrls))
+
+
+    async def bulkAddCrawledWebsiteUrlsAsync(self, crawledUrls: list)->None:
+        if not crawledUrls:
+            return
+        async with self.__db.async_session() as session:
+            await session.execute(self.__crawledUrlsInsert(crawledUrls))
+
+
+    @staticmethod
+    def __crawledUrlsInsert(crawledUrls: list):
+        # A URL that is already stored is skipped instead of failing the batch
+        return insert_rows(
+            CrawledUrl.__table__,
+            [{"crawled_url_address": c.crawled_url_address, "website_id": c.website_id} for c in crawledUrls]
+        ).on_conflict_do_nothing(index_elements=["crawled_url_address"])
+
+
+    def upsertProducts(self, products: list, batchSize: int = 500)->list:
+        """
+        Insert or update the products on their natural key (website_id, product_key), with one
+        INSERT ... ON CONFLICT DO UPDATE per batch of `batchSize` products, one transaction per batch.
+        Stored products whose content hash did not change are left alone; for the others the colors,
+        origins, images and materials are replaced set-wise.
+        Returns the id of every product, None for the ones that were unchanged.
+        """
+        productIds = []
+        for start in range(0, len(products), batchSize):
+            batch = products[start:start + batchSize]
+            with self.__db.session() as session:
+                batchIds, writtenIds, writtenProducts = self.__upsertProductRows(session, batch)
+                if writtenIds:
+                    self.__replaceChildRows(session, writtenIds, writtenProducts, self.__resolveDimensions(writtenProducts))
+            productIds.extend(batchIds)
+        return productIds
+
+
+    async def upsertProductsAsync(self, products: list, batchSize: int = 500)->list:
+        # Same as upsertProducts, on the async engine
+        productIds = []
+        for start in range(0, len(products), batchSize):
+            batch = products[start:start + batchSize]
+            async with self.__db.async_session() as session:
+                batchIds, writtenIds, writtenProducts = await session.run_sync(self.__upsertProductRows, batch)
+                if writtenIds:
+                    dimensionIds = await self.__resolveDimensionsAsync(writtenProducts)
+                    await session.run_sync(self.__replaceChildRows, writtenIds, writtenProducts, dimensionIds)
+            productIds.extend(batchIds)
+        return productIds
+
+
+    def __upsertProductRows(self, session, products: list)->tuple:
+        """
+        Upsert the product rows of a batch.
+        Returns (id of every product or None if unchanged, ids of the written rows, the written products).
+        """
+        # One statement cannot update the same row twice, the last product of a key wins
+        latest = {}
+        for product in products:
+            latest[(product.website_id, product.product_key)] = product
+
+        table = Product.__table__
+        product_columns = [c.name for c in table.columns if c.name != "id"]
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.website_id, table.c.product_key],
+            set_={name: statement.excluded[name] for name in product_columns if name not in ("website_id", "product_key")},
+            where=table.c.product_content_hash.is_distinct_from(statement.excluded.product_content_hash)
+        ).returning(table.c.id, table.c.website_id, table.c.product_key)
+
+        # Only the inserted and the updated rows are returned
+        written = {
+            (website_id, product_key): product_id
+            for product_id, website_id, product_key in session.execute(
+                statement,
+                [{name: getattr(product, name) for name in product_columns} for product in latest.values()]
+            )
+        }
+
+        written_products = [product for key, product in latest.items() if key in written]
+        written_ids = [written[key] for key in latest if key in written]
+        return [written.get((product.website_id, product.product_key)) for product in products], written_ids, written_products
+
+
+    def __replaceChildRows(self, session, product_ids: list, products: list, dimension_ids: tuple)->None:
+        for child in (product_colors_table, product_origins_table, ProductMaterial.__table__, ProductImage.__table__):
+            session.execute(child.delete().where(child.c.product_id.in_(product_ids)))
+        self.__writeChildRows(session, product_ids, products, dimension_ids)
+
+
+    @staticmethod
+    def __insertReturningIds(session, table, rows: list)->list:
+        # Multi-row INSERT returning the generated ids in the order of the rows
+        if not rows:
+            return []
+        result = session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows
+        )
+        return list(result.scalars())
+
+
+    def __insertProductBatch(self, session, products: list)->None:
+        product_columns = [c.name for c in Product.__table__.columns if c.name != "id"]
+        product_ids = self.__insertReturningIds(
+            session,
+            Product.__table__,
+            [{name: getattr(product, name) for name in product_columns} for product in products]
+        )
+        self.__writeChildRows(session, product_ids, products, self.__resolveDimensions(products))
+
+
+    @staticmethod
+    def __dimensionKeys(products: list)->tuple:
+        # Natural keys of the colors, origins and materials of the products, in product order
+        return (
+            [(color.color_id, color.name) for product in products for color in product.colors],
+            [(origin.name,) for product in products for origin in product.origins],
+            [
+                (pm.material.name, pm.material.certification, bool(pm.material.is_certified))
+                for product in products for pm in product.materials
+            ],
+        )
+
+
+    def __resolveDimensions(self, products: list)->tuple:
+        # Colors, origins and materials are shared rows, resolved through the dimension cache
+        colors, origins, materials = self.__dimensionKeys(products)
+        return (
+            self.__dimensions.colorIds(colors),
+            self.__dimensions.originIds(origins),
+            self.__dimensions.materialIds(materials),
+        )
+
+
+    async def __resolveDimensionsAsync(self, products: list)->tuple:
+        colors, origins, materials = self.__dimensionKeys(products)
+        return (
+            await self.__dimensions.colorIdsAsync(colors),
+            await self.__dimensions.originIdsAsync(origins),
+            await self.__dimensions.materialIdsAsync(materials),
+        )
+
+
+    def __writeChildRows(self, session, product_ids: list, products: list, dimension_ids: tuple)->None:
+        # dimension_ids: the ids of __dimensionKeys(products)
+        color_ids, origin_ids, material_ids = dimension_ids
+        colors = [(product_id, color) for product_id, product in zip(product_ids, products) for color in product.colors]
+        origins = [(product_id, origin) for product_id, product in zip(product_ids, products) for origin in product.origins]
+        materials = [(product_id, pm) for product_id, product in zip(product_ids, products) for pm in product.materials]
+
+        images = [
+            {"product_id": product_id, "image_url": image.image_url}
+            for product_id, product in zip(product_ids, products) for image in product.images
+        ]
+
+        link_rows = [
+            (product_colors_table, [
+                {"product_id": product_id, "color_id": color_id}
+                for (product_id, _), color_id in zip(colors, color_ids)
+            ]),
+            (product_origins_table, [
+                {"product_id": product_id, "origin_id": origin_id}
+                for (product_id, _), origin_id in zip(origins, origin_ids)
+            ]),
+            (ProductMaterial.__table__, [
+                {"product_id": product_id, "material_id": material_id, "percentage": pm.percentage, "area": pm.area}
+                for (product_id, pm), material_id in zip(materials, material_ids)
+            ]),
+            (ProductImage.__table__, images),
+        ]
+        for table, rows in link_rows:
+            if rows:
+                session.execute(insert_rows(table, rows))
+
+
+    def getProductHashes(self, websiteId: int)->dict:
+        # product_key -> (product id, content hash) for every product of the website
+        with self.__db.session() as session:
+            rows = session.query(Product.id, Product.product_key, Product.product_content_hash) \
+                .filter(Product.website_id == websiteId).all()
+            return {productKey: (productId, contentHash) for productId, productKey, contentHash in rows}
+
+
+    async def getProductHashesAsync(self, websiteId: int)->dict:
+        async with self.__db.async_session() as session:
+            rows = await session.execute(
+                select(Product.id, Product.product_key, Product.product_content_hash)
+                .where(Product.website_id == websiteId)
+            )
+            return {productKey: (productId, contentHash) for productId, productKey, contentHash in rows}
+
+
+    def getCrawledUrlAddresses(self, websiteId: int)->set:
+        with self.__db.session() as session:
+            rows = session.query(CrawledUrl.crawled_url_address).filter(CrawledUrl.website_id == websiteId).all()
+            return {row[0] for row in rows}
+
+
+    async def getCrawledUrlAddressesAsync(self, websiteId: int)->set:
+        async with self.__db.async_session() as session:
+            rows = await session.scalars(
+                select(CrawledUrl.crawled_url_address).where(CrawledUrl.website_id == websiteId)
+            )
+            return set(rows)
+
+
+    def deleteProducts(self, productIds: list)->None:
+        if not productIds:
+            return
+        with self.__db.session() as session:
+            for statement in self.__deleteProductsStatements(productIds):
+                session.execute(statement)
+
+
+    async def deleteProductsAsync(self, productIds: list)->None:
+        if not productIds:
+            return
+        async with self.__db.async_session() as session:
+            for statement in self.__deleteProductsStatements(productIds):
+                await session.execute(statement)
+
+
+    @staticmethod
+    def __deleteProductsStatements(productIds: list)->list:
+        # Set-based, like purgeWebsite: the colors, origins, materials and images first, then the products.
+        # The ids are one array parameter, so the statements do not grow with the number of products
+        ids = any_(bindparam("product_ids", productIds, type_=ARRAY(Integer)))
+        children = (product_colors_table, product_origins_table, ProductMaterial.__table__, ProductImage.__table__)
+        return [child.delete().where(child.c.product_id == ids) for child in children] + \
+            [Product.__table__.delete().where(Product.id == ids)]
\ No newline at end of file
@@ -0,0 +1,76 @@
+import heapq
+from collections import deque
+from itertools import count
+
+
+class CrawlFrontier:
+    '''
+    Queue of URLs waiting to be crawled, paired with a hash set of every URL ever added,
+    so membership checks are O(1) no matter how large the queue grows.
+
+    Orders:
+        - "dfs": last added URL is crawled first
+        - "bfs": first added URL is crawled first
+        - "priority": lowest priority(url) first, FIFO between equal priorities
+    '''
+    ORDERS = ("dfs", "bfs", "priority")
+
+    def __init__(self, order="dfs", priority=None):
+        if order not in self.ORDERS:
+            raise ValueError(f"Unknown frontier order: {order}")
+
+        self.order = order
+        self.priority = priority or self.product_first
+        self._seen = set()
+        self._queue = [] if order == "priority" else deque()
+        self._counter = count()
+
+    @staticmethod
+    def product_first(url):
+        # Product pages (c0p in the URL) before category pages
+        return 0 if 'c0p' in url.lower() else 1
+
+    def add(self, url) -> bool:
+        # Queue the URL if it was never added before, returns True if it was queued
+        if url in self._seen:
+            return False
+
+        self._seen.add(url)
+        if self.order == "priority":
+            heapq.heappush(self._queue, (self.priority(url), next(self._counter), url))
+        else:
+            self._queue.append(url)
+        return True
+
+    def retry(self, url) -> None:
+        # Queue an already seen URL again, so it is crawled next
+        self._seen.add(url)
+        if self.order == "priority":
+            heapq.heappush(self._queue, (float("-inf"), next(self._counter), url))
+        elif self.order == "bfs":
+            self._queue.appendleft(url)
+        else:
+            self._queue.append(url)
+
+    def pop(self):
+        # Next URL to crawl
+        if self.order == "priority":
+            return heapq.heappop(self._queue)[2]
+        if self.order == "bfs":
+            return self._queue.popleft()
+        return self._queue.pop()
+
+    def queued(self):
+        # URLs still waiting, in no particular order
+        if self.order == "priority":
+            return [entry[2] for entry in self._queue]
+        return list(self._queue)
+
+    def __contains__(self, url):
+        return url in self._seen
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __bool__(self):
+        return len(self._queue) > 0
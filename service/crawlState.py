@@ -0,0 +1,62 @@
+import sqlite3
+import threading
+
+
+class CrawlStateStore:
+    '''
+    SQLite checkpoint of a crawl: the frontier and the visited pages,
+    so an interrupted crawl can be resumed where it stopped.
+    Every crawled page is committed in its own transaction.
+    '''
+
+    def __init__(self, path="crawl_state.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, seq INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_seq ON frontier (seq)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY)")
+
+    def reset(self, start_url):
+        # Forget the previous crawl and start a new one from start_url
+        with self._lock, self._conn:
+            for table in ("meta", "frontier", "visited"):
+                self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('start_url', ?)", (start_url,))
+            self._conn.execute("INSERT INTO frontier (url, seq) VALUES (?, 0)", (start_url,))
+
+    def start_url(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'start_url'").fetchone()
+        return row[0] if row else None
+
+    def load(self):
+        # Visited pages and queued URLs (in the order they were queued) of the last crawl
+        with self._lock:
+            visited = [row[0] for row in self._conn.execute("SELECT url FROM visited")]
+            queued = [row[0] for row in self._conn.execute("SELECT url FROM frontier ORDER BY seq")]
+        return visited, queued
+
+    def checkpoint(self, popped_urls, visited_url, queued_urls):
+        """
+        Record one crawled page: popped_urls leave the frontier, visited_url is marked as visited,
+        and the links queued from it are appended to the frontier.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM frontier WHERE url = ?", [(url,) for url in popped_urls])
+            self._conn.execute("INSERT OR IGNORE INTO visited (url) VALUES (?)", (visited_url,))
+
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier").fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, seq) VALUES (?, ?)",
+                [(url, seq + i) for i, url in enumerate(queued_urls, start=1)]
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
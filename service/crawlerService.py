@@ -1,15 +1,25 @@
 import time
-from urllib.parse import urljoin, urlparse, urldefrag
-from collections import deque
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 
+from service.crawlFrontier import CrawlFrontier
+from service.crawlState import CrawlStateStore
+from service.fetchScheduler import FetchScheduler, RetryableFetchError, is_retryable_status, parse_retry_after
+from service.linkExtractor import extract_links, ANCHOR_HREFS_SCRIPT
+from service.urlClassifier import UrlClassifier, PRODUCT, CATEGORY, OTHER, categorize, is_product_url, normalize_url
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
 
 class CrawlerService:
     _instance = None
@@ -20,53 +30,79 @@ class CrawlerService:
             cls._instance = super(CrawlerService, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, ready_selector=None, use_browser=True):
         if hasattr(self, "_initialized") and self._initialized:
             return
 
         self._initialized = True
+
+        # Without a browser pages are fetched over plain HTTP, one requests.Session per thread
+        self.use_browser = use_browser
+        self.http_timeout = 15
+        self._http_local = threading.local()
+        self._http_sessions = []
+        self._http_sessions_lock = threading.Lock()
+
+        # Per-host rate limit and retries, shared by every driver and with the scraper
+        self.scheduler = FetchScheduler()
+        # Whether the last crawl reached every page of the website
+        self.last_crawl_complete = False
+
+        # Page readiness: a page is usable once the document is loaded and either `ready_selector`
+        # (a site-specific CSS selector) is present, or the anchor and network resource counts
+        # stop changing for `stable_polls` consecutive polls
+        self.ready_selector = ready_selector
+        self.ready_timeout = 10
+        self.poll_interval = 0.2
+        self.stable_polls = 2
+
+        # Infinite scrolling: scroll until a scroll brings no new links within `scroll_wait` seconds
+        self.max_scrolls = 10
+        self.scroll_wait = 1.0
+
         self._init_driver()
 
     def _init_driver(self):
         # Initialize Selenium WebDriver
-        if self._driver is None:
-            try:
-                # Configure Chrome options
-                chrome_options = Options()
-                chrome_options.add_argument('--headless')
-                chrome_options.add_argument('--no-sandbox')
-                chrome_options.add_argument('--disable-dev-shm-usage')
-                chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-                chrome_options.add_argument(
-                    '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-
-                # Exclude automation flags
-                chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-                chrome_options.add_experimental_option('useAutomationExtension', False)
-
-                # Setup driver with automatic driver management
-                service = Service(ChromeDriverManager().install())
-                self._driver = webdriver.Chrome(service=service, options=chrome_options)
-
-                # Execute CDP commands to hide automation
-                self._driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-                    "userAgent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
-                self._driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-                print("Selenium WebDriver initialized successfully")
+        if self._driver is None and self.use_browser:
+            self._driver = self._create_driver()
 
-            except Exception as e:
-                print(f"Error initializing WebDriver: {e}")
-                raise
+    def _create_driver(self):
+        # Create a new Selenium WebDriver
+        try:
+            # Configure Chrome options
+            chrome_options = Options()
+            chrome_options.add_argument('--headless')
+            chrome_options.add_argument('--no-sandbox')
+            chrome_options.add_argument('--disable-dev-shm-usage')
+            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+            chrome_options.add_argument(
+                f'--user-agent={USER_AGENT}')
+
+            # Exclude automation flags
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+
+            # Setup driver with automatic driver management
+            service = Service(ChromeDriverManager().install())
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+
+            # Execute CDP commands to hide automation
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+                "userAgent": USER_AGENT
+            })
+            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+            print("Selenium WebDriver initialized successfully")
+            return driver
+
+        except Exception as e:
+            print(f"Error initializing WebDriver: {e}")
+            raise
 
     def _normalize_url(self, url):
         # Normalize URL by removing fragments and ensuring consistent format
-        url, _ = urldefrag(url)
-        # Ensure URL starts with https and has consistent format
-        if url.startswith('http://'):
-            url = url.replace('http://', 'https://', 1)
-        return url.rstrip('/')
+        return normalize_url(url)
 
     def _is_valid_url(self, url, base_domain, required_path='/ro/'):
         """
@@ -112,37 +148,130 @@ class CrawlerService:
         except Exception:
             return False
 
-    def _get_links_from_page(self, url):
-        # Extract all links from a page using Selenium
-        links = set()
+    @staticmethod
+    def _page_activity(driver):
+        # Number of anchors and of network resources loaded so far
+        return tuple(driver.execute_script(
+            "return [document.getElementsByTagName('a').length,"
+            " performance.getEntriesByType('resource').length];"
+        ))
 
+    def _wait_until_ready(self, driver):
+        # Return as soon as the page is usable, False if it never became usable
         try:
-            print(f"  Loading page: {url}")
-            self._driver.get(url)
-
-            # Wait for page to load
-            time.sleep(2)
+            WebDriverWait(driver, self.ready_timeout, poll_frequency=self.poll_interval).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            return False
 
-            # Try to wait for some content to load
+        if self.ready_selector:
             try:
-                WebDriverWait(self._driver, 10).until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                WebDriverWait(driver, self.ready_timeout, poll_frequency=self.poll_interval).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, self.ready_selector))
                 )
             except TimeoutException:
-                print(f"  Timeout waiting for page to load")
+                print(f"  Selector {self.ready_selector} did not appear, using the page as it is")
+            return True
+
+        # No selector for this site: wait for the links and the network to settle
+        deadline = time.monotonic() + self.ready_timeout
+        last = self._page_activity(driver)
+        stable = 0
+        while stable < self.stable_polls and time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            current = self._page_activity(driver)
+            stable = stable + 1 if current == last else 0
+            last = current
+        return True
+
+    def _scroll_until_stable(self, driver):
+        # Scroll incrementally until the page stops loading new links
+        anchors = self._page_activity(driver)[0]
+        for _ in range(self.max_scrolls):
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+            deadline = time.monotonic() + self.scroll_wait
+            new_anchors = anchors
+            while new_anchors == anchors and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                new_anchors = self._page_activity(driver)[0]
+
+            if new_anchors <= anchors:
+                break
+            anchors = new_anchors
+
+    def _http_session(self):
+        # requests.Session owned by the current thread
+        session = getattr(self._http_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = USER_AGENT
+            self._http_local.session = session
+            with self._http_sessions_lock:
+                self._http_sessions.append(session)
+        return session
+
+    def _get_links_over_http(self, url):
+        # Extract all links from the server HTML of a page, without a browser
+        def fetch():
+            print(f"  Fetching page: {url}")
+            try:
+                response = self._http_session().get(url, timeout=self.http_timeout)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                raise RetryableFetchError(str(e))
+            if is_retryable_status(response.status_code):
+                raise RetryableFetchError(
+                    f"HTTP {response.status_code}", parse_retry_after(response.headers.get("Retry-After")),
+                    response.status_code
+                )
+            response.raise_for_status()
+            return response
+
+        try:
+            response = self.scheduler.call(url, fetch, queue="crawl")
+        except requests.RequestException as e:
+            print(f"  Error loading page: {e}")
+            return set()
+        if response is None:
+            return set()
+
+        # Resolve relative links against the final URL, after redirects
+        links = {urljoin(response.url, link) for link in extract_links(response.text)}
+        print(f"  Found {len(links)} raw links")
+        return links
+
+    def _get_links_from_page(self, url, driver=None):
+        # Extract all links from a page using Selenium, or plain HTTP when running without a browser
+        if not self.use_browser:
+            return self._get_links_over_http(url)
+
+        driver = driver or self._driver
+        links = set()
+
+        def load():
+            print(f"  Loading page: {url}")
+            try:
+                driver.get(url)
+            except WebDriverException as e:
+                raise RetryableFetchError(f"{type(e).__name__}: {e}")
+
+            # Wait until the page is usable
+            if not self._wait_until_ready(driver):
+                raise RetryableFetchError("Timeout waiting for page to load")
+            return True
+
+        try:
+            if not self.scheduler.call(url, load, queue="crawl"):
                 return links
 
             # Scroll to load dynamic content
-            self._driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+            self._scroll_until_stable(driver)
 
-            # Try to find all links
+            # Collect every href with a single WebDriver round trip
             try:
-                all_links = self._driver.find_elements(By.TAG_NAME, 'a')
-                for link in all_links:
-                    href = link.get_attribute('href')
-                    if href:
-                        links.add(href)
+                hrefs = driver.execute_script(ANCHOR_HREFS_SCRIPT) or []
+                links.update(href for href in hrefs if href)
 
             except Exception as e:
                 print(f"  Error extracting links: {e}")
@@ -154,10 +283,80 @@ class CrawlerService:
             print(f"  Error loading page: {e}")
             return links
 
-    def dfsCrawl(self, start_url, max_pages=50):
-        # Crawl website using DFS (Depth First Search) Algorithm with Selenium
+    def _start_frontier(self, start_url, order, state=None, resume=False):
+        # Visited set and frontier of a new crawl, restored from the checkpoint when resuming
         visited = set()
-        to_visit = deque([start_url])
+        to_visit = CrawlFrontier(order)
+        # Forget the pages that failed in a previous crawl
+        self.scheduler.take_dead_letters("crawl")
+
+        if state is not None and resume and state.start_url() == start_url:
+            previous_visited, queued = state.load()
+            visited.update(previous_visited)
+            for url in queued:
+                to_visit.add(url)
+            print(f"Resuming crawl: {len(visited)} pages already visited, {len(to_visit)} in queue")
+        else:
+            to_visit.add(start_url)
+            if state is not None:
+                state.reset(start_url)
+
+        return visited, to_visit
+
+    def _product_url_emitter(self, on_product_url):
+        # on_product_url wrapped to be called at most once per product page, from any thread
+        emitted = set()
+        lock = threading.Lock()
+
+        def emit(url):
+            if on_product_url is None or not is_product_url(url):
+                return
+            with lock:
+                if url in emitted:
+                    return
+                emitted.add(url)
+            on_product_url(url)
+
+        return emit
+
+    def _requeue_dead_letters(self, visited, to_visit):
+        # Queue the pages that failed after every retry once more, returns False if there are none
+        dead_letters = self.scheduler.take_dead_letters("crawl")
+        for url in dead_letters:
+            visited.discard(url)
+            to_visit.retry(url)
+        if dead_letters:
+            print(f"\nRetrying {len(dead_letters)} pages that failed permanently\n")
+        return bool(dead_letters)
+
+    def _frontier_exhausted(self, to_visit):
+        # True if every page found was crawled: the queue is empty and no page still failed after its retry
+        failed = self.scheduler.take_dead_letters("crawl")
+        if failed:
+            print(f"  {len(failed)} pages still failed, the crawl did not cover the whole website")
+        return not to_visit and not failed
+
+    @staticmethod
+    def _checkpoint(state, popped_urls, visited_url, queued_urls):
+        # A checkpoint that cannot be written only weakens the resume, the crawl goes on
+        if state is None:
+            return
+        try:
+            state.checkpoint(popped_urls, visited_url, queued_urls)
+        except Exception as e:
+            print(f"  Error checkpointing {visited_url}: {e}")
+
+    def dfsCrawl(self, start_url, max_pages=50, order="dfs", state=None, resume=False, on_product_url=None):
+        """
+        Crawl website using DFS (Depth First Search) Algorithm with Selenium, or the given frontier order.
+        on_product_url(url) is called for every product page as soon as it is reached.
+        Sets last_crawl_complete to whether the whole website was crawled (the queue emptied before max_pages).
+        """
+        self.last_crawl_complete = False
+        visited, to_visit = self._start_frontier(start_url, order, state, resume)
+        emit = self._product_url_emitter(on_product_url)
+        for url in visited:
+            emit(url)
         parsed_start = urlparse(start_url)
         base_domain = parsed_start.netloc
 
@@ -166,8 +365,17 @@ class CrawlerService:
         print(f"Required path: /ro/")
         print(f"Max pages: {max_pages}\n")
 
+        retried = False
         try:
-            while to_visit and len(visited) < max_pages:
+            while True:
+                if not to_visit or len(visited) >= max_pages:
+                    # The pages that failed get one more try at the end of the crawl
+                    if retried or not self._requeue_dead_letters(visited, to_visit):
+                        self.last_crawl_complete = self._frontier_exhausted(to_visit)
+                        break
+                    retried = True
+                    continue
+
                 url = to_visit.pop()
                 normalized_url = self._normalize_url(url)
 
@@ -175,27 +383,17 @@ class CrawlerService:
                     continue
 
                 print(f"Crawling [{len(visited) + 1}/{max_pages}]: {normalized_url}")
+                emit(normalized_url)
 
                 # Get links from current page
                 new_links = self._get_links_from_page(normalized_url)
                 visited.add(normalized_url)
 
                 # Process found links
-                valid_links = 0
-                for link in new_links:
-                    try:
-                        absolute_url = urljoin(normalized_url, link)
-                        normalized_absolute = self._normalize_url(absolute_url)
-
-                        if self._is_valid_url(normalized_absolute, base_domain, required_path='/ro/'):
-                            if (normalized_absolute not in visited and
-                                    normalized_absolute not in to_visit):
-                                to_visit.append(normalized_absolute)
-                                valid_links += 1
-                    except Exception as e:
-                        continue
-
-                print(f"  Added {valid_links} new URLs to crawl queue")
+                queued_links = self._enqueue_links(normalized_url, new_links, base_domain, visited, to_visit)
+                self._checkpoint(state, {url, normalized_url}, normalized_url, queued_links)
+
+                print(f"  Added {len(queued_links)} new URLs to crawl queue")
                 print(f"  Total in queue: {len(to_visit)}, Visited: {len(visited)}\n")
 
         except KeyboardInterrupt:
@@ -209,29 +407,158 @@ class CrawlerService:
 
             return list(visited)
 
+    def _enqueue_links(self, page_url, links, base_domain, visited, to_visit):
+        # Add the valid, not yet seen links found on page_url to the crawl queue, returns the queued links
+        queued_links = []
+        for link in links:
+            try:
+                absolute_url = urljoin(page_url, link)
+                normalized_absolute = self._normalize_url(absolute_url)
+
+                if self._is_valid_url(normalized_absolute, base_domain, required_path='/ro/'):
+                    # The frontier only queues URLs it has never seen
+                    if normalized_absolute not in visited and to_visit.add(normalized_absolute):
+                        queued_links.append(normalized_absolute)
+            except Exception as e:
+                continue
+        return queued_links
+
+    def parallelCrawl(self, start_url, max_pages=50, workers=4, order="dfs", state=None, resume=False,
+                      on_product_url=None):
+        """
+        Crawl website with a pool of `workers` WebDrivers sharing one frontier and one visited set.
+        Page loads are rate limited per host by the shared FetchScheduler.
+        on_product_url(url) is called for every product page as soon as a driver claims it.
+        Sets last_crawl_complete like dfsCrawl.
+        """
+        self.last_crawl_complete = False
+        visited, to_visit = self._start_frontier(start_url, order, state, resume)
+        emit = self._product_url_emitter(on_product_url)
+        for url in visited:
+            emit(url)
+        parsed_start = urlparse(start_url)
+        base_domain = parsed_start.netloc
+
+        # Guards visited/to_visit; workers wait on it while the queue is empty but pages are still loading
+        frontier_lock = threading.Condition()
+        in_progress = 0
+        retried = False
+        stop = threading.Event()
+
+        print(f"\nStarting parallel crawl of {base_domain} with {workers} drivers...")
+        print(f"Start URL: {start_url}")
+        print(f"Required path: /ro/")
+        print(f"Max pages: {max_pages}\n")
+
+        def next_url():
+            nonlocal in_progress, retried
+            with frontier_lock:
+                while True:
+                    if stop.is_set():
+                        return None
+                    if to_visit and len(visited) < max_pages:
+                        url = to_visit.pop()
+                        normalized_url = self._normalize_url(url)
+                        if normalized_url in visited:
+                            continue
+                        # Claim the page so no other driver loads it
+                        visited.add(normalized_url)
+                        in_progress += 1
+                        print(f"Crawling [{len(visited)}/{max_pages}]: {normalized_url}")
+                        emit(normalized_url)
+                        return url, normalized_url
+                    if in_progress == 0:
+                        # Nothing left to crawl: the pages that failed get one more try
+                        if not retried and self._requeue_dead_letters(visited, to_visit):
+                            retried = True
+                            continue
+                        return None
+                    frontier_lock.wait()
+
+        def crawl_with(driver):
+            nonlocal in_progress
+            while True:
+                claimed = next_url()
+                if claimed is None:
+                    return
+                url, normalized_url = claimed
+
+                try:
+                    new_links = self._get_links_from_page(normalized_url, driver)
+                except Exception as e:
+                    print(f"  Error crawling {normalized_url}: {e}")
+                    new_links = set()
+
+                with frontier_lock:
+                    # The page is released whatever happens, the other drivers wait on in_progress
+                    try:
+                        queued_links = self._enqueue_links(normalized_url, new_links, base_domain, visited, to_visit)
+                        self._checkpoint(state, {url, normalized_url}, normalized_url, queued_links)
+                        print(f"  Added {len(queued_links)} new URLs to crawl queue from {normalized_url}")
+                        print(f"  Total in queue: {len(to_visit)}, Visited: {len(visited)}\n")
+                    finally:
+                        in_progress -= 1
+                        frontier_lock.notify_all()
+
+        def run_worker(index):
+            # The first worker reuses the service driver, the others get their own
+            if not self.use_browser:
+                driver = None
+            else:
+                driver = self._driver if index == 0 else self._create_driver()
+            try:
+                crawl_with(driver)
+            finally:
+                if driver is not None and index != 0:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(run_worker, i) for i in range(workers)]
+            workers_ok = True
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"\nError in crawl worker: {e}")
+                    workers_ok = False
+            self.last_crawl_complete = workers_ok and self._frontier_exhausted(to_visit)
+        except KeyboardInterrupt:
+            print("\nCrawl interrupted by user")
+        finally:
+            # Let the drivers finish their current page and stop
+            stop.set()
+            with frontier_lock:
+                frontier_lock.notify_all()
+            executor.shutdown(wait=True)
+
+            print(f"\nCrawl completed!")
+            print(f"Total unique pages crawled: {len(visited)}")
+            print(f"Remaining in queue: {len(to_visit)}")
+
+        return list(visited)
+
     def filter_ro_urls(self, urls):
-        # Filter URLs to keep only those containing /ro/ after domain
-        filtered = []
-        for url in urls:
-            normalized = self._normalize_url(url)
-            if '/ro/' in normalized and normalized.startswith('https://www.bershka.com'):
-                filtered.append(normalized)
-        return filtered
+        # Filter URLs to keep only those containing /ro/ after domain, normalized and without duplicates
+        return UrlClassifier().extend(urls).filtered_urls
 
     def categorize_urls(self, urls):
-        # Categorize URLs into product pages, category pages, and other pages
-        product_urls = [url for url in urls if 'c0p' in url.lower()]
-        category_urls = [url for url in urls if '/ro/' in url.lower() and 'c0p' not in url.lower()]
-        other_urls = [url for url in urls if url not in product_urls and url not in category_urls]
+        # Categorize URLs into product pages, category pages, and other pages, in one pass
+        buckets = {PRODUCT: [], CATEGORY: [], OTHER: []}
+        for url in urls:
+            buckets[categorize(url)].append(url)
 
         return {
-            'product_urls': product_urls,
-            'category_urls': category_urls,
-            'other_urls': other_urls,
+            'product_urls': buckets[PRODUCT],
+            'category_urls': buckets[CATEGORY],
+            'other_urls': buckets[OTHER],
             'total': len(urls),
-            'product_count': len(product_urls),
-            'category_count': len(category_urls),
-            'other_count': len(other_urls)
+            'product_count': len(buckets[PRODUCT]),
+            'category_count': len(buckets[CATEGORY]),
+            'other_count': len(buckets[OTHER])
         }
 
     def validate_urls(self, urls):
@@ -288,27 +615,39 @@ class CrawlerService:
                     f.write(url + '\n')
             print(f"Category URLs saved to 'category_urls.txt'")
 
-    def crawl_website(self, start_url, max_pages=50, output_files=True):
-        # Main method to crawl website and return all results
+    def crawl_website(self, start_url, max_pages=50, output_files=True, workers=1, order="dfs",
+                      resume=False, state_path="crawl_state.sqlite", on_product_url=None):
+        # Main method to crawl website and return all results, product pages are also streamed to on_product_url
         print("=" * 60)
         print("Starting Web Crawler with Selenium")
         print("=" * 60)
 
+        # Every crawled page is checkpointed, so an interrupted crawl can be resumed
+        state = CrawlStateStore(state_path)
+
         # Start crawling
-        raw_result = self.dfsCrawl(start_url, max_pages)
+        try:
+            if workers > 1:
+                raw_result = self.parallelCrawl(start_url, max_pages, workers, order=order, state=state,
+                                                resume=resume, on_product_url=on_product_url)
+            else:
+                raw_result = self.dfsCrawl(start_url, max_pages, order, state=state, resume=resume,
+                                           on_product_url=on_product_url)
+        finally:
+            state.close()
 
         print("\n" + "=" * 60)
         print("Crawl Results:")
         print("=" * 60)
 
-        # Apply additional filtering to ensure all URLs contain /ro/
-        filtered_result = self.filter_ro_urls(raw_result)
+        # Filter (all URLs must contain /ro/), categorize and validate every URL in a single pass
+        classifier = UrlClassifier().extend(raw_result)
+        filtered_result = classifier.filtered_urls
 
         print(f"Found {len(raw_result)} raw URLs")
         print(f"After filtering for /ro/: {len(filtered_result)} URLs\n")
 
-        # Categorize URLs
-        categorization = self.categorize_urls(filtered_result)
+        categorization = classifier.categorization()
 
         print(f"Product pages: {categorization['product_count']}")
         print(f"Category pages: {categorization['category_count']}")
@@ -319,7 +658,7 @@ class CrawlerService:
         print("URL Validation Check:")
         print("=" * 60)
 
-        validation = self.validate_urls(filtered_result)
+        validation = classifier.validation()
 
         if validation['invalid_start_urls']:
             print(f"WARNING: Found {len(validation['invalid_start_urls'])} URLs that don't start with https://www.bershka.com/ro")
@@ -351,16 +690,21 @@ class CrawlerService:
             'filtered_urls': filtered_result,
             'categorization': categorization,
             'validation': validation,
-            'sample_urls': filtered_result if filtered_result else []
+            'sample_urls': filtered_result if filtered_result else [],
+            # Every product page of the website was found, so the stored products not found are gone
+            'complete': self.last_crawl_complete and categorization['product_count'] > 0
         }
 
     def close(self):
         try:
             if self._driver:
                 self._driver.quit()
+            for session in self._http_sessions:
+                session.close()
         except Exception:
             pass
         finally:
+            self._http_sessions = []
             self._driver = None
             self._initialized = False
             CrawlerService._instance = None
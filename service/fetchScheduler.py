@@ -0,0 +1,137 @@
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class RetryableFetchError(Exception):
+    # A fetch that can succeed later: HTTP 429/5xx, a timeout or a dropped connection
+    def __init__(self, reason, retry_after=None, status_code=None):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+def is_retryable_status(status_code) -> bool:
+    return status_code == 429 or 500 <= status_code < 600
+
+
+def parse_retry_after(value):
+    # Seconds from a Retry-After header, None if it is missing or is not a number of seconds
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    # `rate` requests per second on average, with bursts of up to `burst` requests
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now):
+        # Take one token, returns how long the caller has to wait before using it
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+
+class FetchScheduler:
+    '''
+    Throttling and retries shared by every fetch of the process, from crawler threads and from
+    the asyncio scraper alike:
+        - a token bucket per host, so a host never gets more than `rate` requests per second
+        - exponential backoff with full jitter on 429/5xx/timeouts, honouring Retry-After;
+          a 429 also pauses the whole host, not only the request that got it
+        - a dead-letter list per caller of the URLs that still failed after `max_retries` retries
+    '''
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(FetchScheduler, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, rate=4.0, burst=8, max_retries=4, base_delay=1.0, max_delay=60.0):
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+
+        self._initialized = True
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._dead_letters = {}
+
+    def _reserve(self, url) -> float:
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = _TokenBucket(self.rate, self.burst)
+            return bucket.reserve(time.monotonic())
+
+    def _pause_host(self, url, seconds) -> None:
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is not None:
+                bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+
+    def _backoff(self, url, attempt, error) -> float:
+        # Full jitter: uniform in [0, min(max_delay, base_delay * 2^attempt)]
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, min(self.max_delay, error.retry_after))
+        if error.retry_after is not None or error.status_code == 429:
+            # The host asked us to slow down, every request to it waits, not only this one
+            self._pause_host(url, delay)
+        return delay
+
+    def _give_up(self, url, queue, error) -> None:
+        print(f"  Giving up on {url} after {self.max_retries} retries: {error}")
+        with self._lock:
+            self._dead_letters.setdefault(queue, []).append(url)
+
+    def call(self, url, fetch, queue="default"):
+        """
+        Run fetch() for url within the host rate limit, retrying RetryableFetchError with backoff.
+        Returns what fetch() returned, or None if the URL went to the dead-letter list `queue`.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(url))
+            try:
+                return fetch()
+            except RetryableFetchError as e:
+                if attempt == self.max_retries:
+                    self._give_up(url, queue, e)
+                    return None
+                time.sleep(self._backoff(url, attempt, e))
+
+    async def acall(self, url, fetch, queue="default"):
+        # Same as call(), for a coroutine function fetch
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._reserve(url))
+            try:
+                return await fetch()
+            except RetryableFetchError as e:
+                if attempt == self.max_retries:
+                    self._give_up(url, queue, e)
+                    return None
+                await asyncio.sleep(self._backoff(url, attempt, e))
+
+    def take_dead_letters(self, queue="default") -> list:
+        # URLs that failed permanently, the list is emptied
+        with self._lock:
+            return self._dead_letters.pop(queue, [])
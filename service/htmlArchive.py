@@ -0,0 +1,136 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+
+class HtmlArchive:
+    '''
+    Compressed, content-addressed archive of every fetched page.
+
+    Pages are appended to WARC-like segment files (segment-00001.warc.gz, ...), one gzip member
+    per record, so a segment can also be read with any gzip tool. A page is stored once per
+    distinct content (sha256 digest); every fetch is recorded in a SQLite index keyed by URL and
+    fetch time, which points to the record holding its content.
+    '''
+
+    def __init__(self, root="html_archive", segment_size=256 * 1024 * 1024, compresslevel=6):
+        self.root = root
+        self.segment_size = segment_size
+        self.compresslevel = compresslevel
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " digest TEXT PRIMARY KEY, segment TEXT NOT NULL, offset INTEGER NOT NULL, length INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS fetches ("
+                " url TEXT NOT NULL, fetched_at TEXT NOT NULL, digest TEXT NOT NULL REFERENCES records (digest))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS fetches_url_time ON fetches (url, fetched_at)")
+
+        self._segment = self._current_segment()
+
+    def _current_segment(self):
+        segments = sorted(name for name in os.listdir(self.root) if name.endswith(".warc.gz"))
+        return segments[-1] if segments else "segment-00001.warc.gz"
+
+    def _next_segment(self):
+        number = int(self._segment.split("-")[1].split(".")[0]) + 1
+        return f"segment-{number:05d}.warc.gz"
+
+    def store(self, url: str, html: str, fetched_at: datetime = None) -> str:
+        # Archive one fetch of url, returns the digest of its content
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        body = html.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM records WHERE digest = ?", (digest,)).fetchone()
+            with self._conn:
+                if known is None:
+                    segment, offset, length = self._append(url, fetched_at, digest, body)
+                    self._conn.execute(
+                        "INSERT INTO records (digest, segment, offset, length) VALUES (?, ?, ?, ?)",
+                        (digest, segment, offset, length)
+                    )
+                self._conn.execute(
+                    "INSERT INTO fetches (url, fetched_at, digest) VALUES (?, ?, ?)",
+                    (url, fetched_at.isoformat(), digest)
+                )
+        return digest
+
+    def _append(self, url, fetched_at, digest, body):
+        # Write one WARC-like record as its own gzip member at the end of the current segment
+        header = (
+            "WARC/1.1\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {fetched_at.isoformat()}\r\n"
+            f"WARC-Payload-Digest: sha256:{digest}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        record = gzip.compress(header + body + b"\r\n\r\n", compresslevel=self.compresslevel)
+
+        path = os.path.join(self.root, self._segment)
+        if os.path.exists(path) and os.path.getsize(path) + len(record) > self.segment_size:
+            self._segment = self._next_segment()
+            path = os.path.join(self.root, self._segment)
+
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(record)
+        return self._segment, offset, len(record)
+
+    def load(self, digest: str) -> str | None:
+        # Content of a record, None if the digest is unknown
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM records WHERE digest = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        segment, offset, length = row
+        with open(os.path.join(self.root, segment), "rb") as f:
+            f.seek(offset)
+            record = gzip.decompress(f.read(length))
+
+        # Drop the WARC header and the record separator
+        body = record[record.index(b"\r\n\r\n") + 4:-4]
+        return body.decode("utf-8")
+
+    def latest(self, url: str) -> str | None:
+        # Content of the last fetch of url
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM fetches WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+        return self.load(row[0]) if row else None
+
+    def history(self, url: str) -> list:
+        # (fetched_at, digest) of every fetch of url, oldest first
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_at, digest FROM fetches WHERE url = ? ORDER BY fetched_at", (url,)
+            ).fetchall()
+
+    def latest_fetches(self) -> list:
+        # (url, fetched_at, digest) of the last fetch of every archived URL
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, MAX(fetched_at), digest FROM fetches GROUP BY url ORDER BY url"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
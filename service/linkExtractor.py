@@ -0,0 +1,24 @@
+import html as html_mod
+import re
+
+# href attribute of every anchor, double quoted, single quoted or unquoted
+_ANCHOR_HREF_RE = re.compile(
+    r'<a\b[^>]*?\shref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE
+)
+
+# Browser side equivalent: every resolved href in a single WebDriver round trip
+ANCHOR_HREFS_SCRIPT = "return Array.from(document.querySelectorAll('a[href]'), a => a.href);"
+
+
+def extract_links(html: str) -> set:
+    """
+    Extract the href of every anchor from raw HTML in a single pass.
+    Relative links are returned as they are, resolve them against the page URL.
+    """
+    links = set()
+    for double_quoted, single_quoted, unquoted in _ANCHOR_HREF_RE.findall(html):
+        href = (double_quoted or single_quoted or unquoted).strip()
+        if href and not href.startswith(("javascript:", "mailto:", "tel:", "#")):
+            links.add(html_mod.unescape(href))
+    return links
@@ -0,0 +1,116 @@
+import re
+
+# Scanner for the Nuxt SSR payload:
+#
+#   window.__NUXT__=(function(a,b,c,...){ ... }(arg1,arg2,...));
+#
+# The parameter list and the argument list are read in one forward pass each, in linear time,
+# without building match lists or copying the (multi-megabyte) script.
+
+NUXT_PREFIX = "window.__NUXT__=(function("
+
+# One JS literal of the argument list, incl. void 0 / undefined
+_LITERAL_RE = re.compile(
+    r'\s*(?:'
+    r'"((?:\\.|[^"\\])*)"'
+    r"|'((?:\\.|[^'\\])*)'"
+    r'|(true|false|null|void\s+0|undefined)'
+    r'|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)'
+    r')\s*',
+    re.IGNORECASE
+)
+
+_KEYWORDS = {"true": True, "false": False, "null": None, "undefined": None}
+
+
+def decode_js_string(s: str) -> str:
+    # decode only if escape sequences exist; otherwise unicode_escape can corrupt UTF-8
+    if "\\u" in s or "\\x" in s:
+        try:
+            return s.encode("utf-8").decode("unicode_escape")
+        except Exception:
+            return s
+    return s
+
+
+def scan_params(script: str, start: int = 0):
+    """
+    Parameter names of the IIFE and the index where the function body starts,
+    or ([], -1) if the script is not a Nuxt payload.
+    """
+    prefix = script.find(NUXT_PREFIX, start)
+    if prefix == -1:
+        return [], -1
+
+    params_start = prefix + len(NUXT_PREFIX)
+    params_end = script.find(")", params_start)
+    if params_end == -1 or script[params_end + 1:params_end + 2] != "{":
+        return [], -1
+
+    params = [p.strip() for p in script[params_start:params_end].split(",") if p.strip()]
+    return params, params_end + 2
+
+
+def find_call_boundary(script: str, body_start: int = 0, window: int = 600) -> int:
+    """
+    Index of the "}(" that closes the function body and opens the argument list, or -1.
+    It is the last "}(" whose next `window` chars contain no braces: the arguments are literals only.
+    Walks backwards from the end of the script with str.rfind, so only the tail is visited.
+    """
+    end = len(script)
+    while True:
+        candidate = script.rfind("}(", body_start, end)
+        if candidate == -1:
+            return -1
+
+        tail_end = min(len(script), candidate + window)
+        if script.find("{", candidate + 2, tail_end) == -1 and script.find("}", candidate + 2, tail_end) == -1:
+            return candidate
+        end = candidate + 1
+
+
+def scan_literals(script: str, pos: int, limit: int = None) -> list:
+    """
+    Decode the comma separated JS literals starting at `pos`, up to `limit` values.
+    Stops at the first thing that is not a literal (e.g. the closing parenthesis).
+    """
+    values = []
+    length = len(script)
+    while pos < length and (limit is None or len(values) < limit):
+        m = _LITERAL_RE.match(script, pos)
+        if not m:
+            break
+
+        double_quoted, single_quoted, keyword, number = m.groups()
+        if double_quoted is not None:
+            values.append(decode_js_string(double_quoted))
+        elif single_quoted is not None:
+            values.append(decode_js_string(single_quoted))
+        elif keyword is not None:
+            values.append(_KEYWORDS.get(keyword.lower()))
+        else:
+            values.append(float(number) if "." in number or "e" in number.lower() else int(number))
+
+        pos = m.end()
+        if pos >= length or script[pos] != ",":
+            break
+        pos += 1
+
+    return values
+
+
+def parse_nuxt_payload(script: str) -> dict:
+    """
+    Build mapping param_name -> literal_value from the Nuxt payload script.
+    The args list is huge and contains the real strings like "bumbac", "97%".
+    """
+    params, body_start = scan_params(script)
+    if not params:
+        return {}
+
+    boundary = find_call_boundary(script, body_start)
+    if boundary == -1:
+        return {}
+
+    values = scan_literals(script, boundary + 2, len(params))
+    return dict(zip(params, values))
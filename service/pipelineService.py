@@ -0,0 +1,342 @@
+import asyncio
+import multiprocessing
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, BrokenExecutor
+from urllib.parse import urlparse
+
+from model import CrawledUrl
+from service import productParser
+from service.scraperService import ScraperService
+from service.websiteService import WebsiteService
+
+_DONE = object()
+
+
+class PipelineService:
+    '''
+    Bounded-concurrency scraping pipeline:
+    url source -> N fetch workers -> parse worker pool -> single DB sink writing in batches
+    '''
+
+    def __init__(self, websiteService: WebsiteService, scraperService: ScraperService,
+                 concurrency: int = 8, per_host_concurrency: int = 4, parse_workers: int = 4,
+                 batch_size: int = 500, parse_mode: str = "process", db_mode: str = "async",
+                 flush_interval: float = 2.0):
+        self.__websiteService = websiteService
+        self.__scraperService = scraperService
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.parse_workers = max(1, parse_workers)
+        # "process": parse in worker processes, so parsing scales with the cores instead of the GIL
+        # "thread": parse in worker threads of this process
+        self.parse_mode = parse_mode
+        # Created on the first run and kept, so the worker processes are only started once
+        self._parse_executor = None
+        self.batch_size = max(1, batch_size)
+        # A batch is also written once its oldest product waited this many seconds, so the first
+        # products reach the database while the crawl is still running
+        self.flush_interval = max(0.0, flush_interval)
+        # "async": database calls go through the async engine, on the event loop
+        # "thread": the sync repository methods run in worker threads
+        self.db_mode = db_mode
+
+    async def run(self, urls, website_id: int, incremental: bool = False, fetch=None,
+                  remove_missing=True, snapshots: bool = True) -> dict:
+        """
+        Scrape every URL from `urls` (a list or an async iterable) and persist the products.
+        At most `concurrency` fetches are in flight, and at most `per_host_concurrency` per host.
+        `fetch` is the coroutine function returning the HTML of a URL, the live fetch by default.
+
+        In incremental mode the stored products are kept: a product is only replaced when the hash
+        of its scraped payload changed, and (with `remove_missing`) stored products that were not
+        found anymore are removed. `remove_missing` can also be a function, called once every URL has
+        been read, for sources that only know at the end whether they listed the whole catalog.
+
+        With `snapshots`, the price and stock of the stored products are appended to the price history,
+        as of the start of the run.
+
+        Returns the run statistics.
+        """
+        stats = {"queued": 0, "fetched": 0, "failed": 0, "stored": 0}
+        if incremental:
+            stats.update({"unchanged": 0, "updated": 0, "new": 0, "removed": 0})
+            known_products = await self._db("getProductHashes", website_id)
+            known_urls = await self._db("getCrawledUrlAddresses", website_id)
+        else:
+            known_products = {}
+            known_urls = set()
+        seen_products = set()
+
+        snapshot = None
+        if snapshots:
+            website = await self._db("getWebsiteById", website_id)
+            snapshot = (website.website_name, datetime.now(timezone.utc))
+
+        url_queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        sink_queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        host_limits = {}
+        loop = asyncio.get_running_loop()
+        fetch = fetch or self.__scraperService.fetchHTML
+
+        def host_limit(url):
+            host = urlparse(url).netloc
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+            return host_limits[host]
+
+        async def produce():
+            if hasattr(urls, "__aiter__"):
+                async for url in urls:
+                    await enqueue(url)
+            else:
+                for url in urls:
+                    await enqueue(url)
+            for _ in range(self.concurrency):
+                await url_queue.put(_DONE)
+
+        async def enqueue(url):
+            url = url.strip()
+            if url:
+                stats["queued"] += 1
+                await url_queue.put(url)
+
+        async def fetch_worker():
+            while True:
+                url = await url_queue.get()
+                if url is _DONE:
+                    return
+
+                try:
+                    async with host_limit(url):
+                        html = await fetch(url)
+                except Exception as e:
+                    print(f"  Fetch error for {url}: {e}")
+                    html = None
+
+                if html is None:
+                    stats["failed"] += 1
+                    continue
+
+                stats["fetched"] += 1
+                print(f"Scraped product {stats['fetched']} out of {stats['queued']} queued")
+
+                # Parsing is CPU bound, keep it off the event loop
+                executor = self._parseExecutor()
+                try:
+                    product_data = await loop.run_in_executor(executor, productParser.parse_product_html, html)
+                except BrokenExecutor as e:
+                    # A parse worker died (e.g. killed for running out of memory), the next URL gets a new pool
+                    print(f"  Parse workers failed on {url}, restarting them: {e}")
+                    self._discardParseExecutor(executor)
+                    stats["failed"] += 1
+                    continue
+                except Exception as e:
+                    print(f"  Parse error for {url}: {e}")
+                    stats["failed"] += 1
+                    continue
+                await sink_queue.put((url, product_data))
+
+        # New products, changed products and crawled URLs are buffered and written in batches
+        pending_products = []
+        pending_updates = []
+        pending_urls = []
+
+        async def flush():
+            if not pending_products and not pending_updates and not pending_urls:
+                return
+            products, updates, crawled_urls = list(pending_products), list(pending_updates), list(pending_urls)
+            pending_products.clear()
+            pending_updates.clear()
+            pending_urls.clear()
+            try:
+                await self._flush(products, updates, crawled_urls, snapshot)
+                stats["stored"] += len(products) + len(updates)
+            except Exception as e:
+                print(f"  Error saving a batch of {len(products) + len(updates)} products: {e}")
+                stats["failed"] += len(products) + len(updates)
+
+        async def sink():
+            # Event loop time at which the oldest buffered product was queued, None when nothing is buffered
+            oldest = None
+            while True:
+                timeout = None if oldest is None else max(0.0, oldest + self.flush_interval - loop.time())
+                try:
+                    item = await asyncio.wait_for(sink_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    await flush()
+                    oldest = None
+                    continue
+
+                if item is _DONE:
+                    await flush()
+                    return
+
+                url, product_data = item
+                if not product_data or product_data.get("error") or not product_data.get("name"):
+                    print(f"  Skipping {url}: no product data")
+                    stats["failed"] += 1
+                    continue
+                if product_data.get("price") is None:
+                    # product_price is NOT NULL, one such product would fail the whole batch
+                    print(f"  Skipping {url}: no price")
+                    stats["failed"] += 1
+                    continue
+
+                try:
+                    outcome, product, productId = self._prepare(
+                        url, product_data, website_id, known_products, known_urls, seen_products, pending_urls
+                    )
+                    if outcome == "new":
+                        pending_products.append(product)
+                    elif outcome == "updated":
+                        pending_updates.append((productId, product))
+                    if incremental:
+                        stats[outcome] += 1
+                except Exception as e:
+                    print(f"  Error saving {url}: {e}")
+                    stats["failed"] += 1
+
+                if oldest is None and (pending_products or pending_updates or pending_urls):
+                    oldest = loop.time()
+                if len(pending_products) + len(pending_updates) >= self.batch_size \
+                        or (oldest is not None and loop.time() - oldest >= self.flush_interval):
+                    await flush()
+                    oldest = None
+
+        sink_task = asyncio.create_task(sink())
+        workers = [asyncio.create_task(fetch_worker()) for _ in range(self.concurrency)]
+        # The URLs are produced while the workers run, so a worker that died cannot leave it blocked on a full queue
+        producer = asyncio.create_task(produce())
+        try:
+            await asyncio.gather(producer, *workers)
+
+            # The URLs that failed after every retry get one more round, once the rest is done
+            dead_letters = self.__scraperService.takeDeadLetters()
+            if dead_letters:
+                print(f"\nRetrying {len(dead_letters)} URLs that failed permanently")
+                stats["failed"] -= len(dead_letters)
+                workers = [asyncio.create_task(fetch_worker()) for _ in range(self.concurrency)]
+                for url in dead_letters:
+                    await url_queue.put(url)
+                for _ in workers:
+                    await url_queue.put(_DONE)
+                await asyncio.gather(*workers)
+
+                dead_letters = self.__scraperService.takeDeadLetters()
+                if dead_letters:
+                    print(f"  {len(dead_letters)} URLs still failed")
+
+            await sink_queue.put(_DONE)
+            await sink_task
+        finally:
+            for task in workers + [producer, sink_task]:
+                task.cancel()
+
+        if callable(remove_missing):
+            remove_missing = remove_missing()
+        if incremental and remove_missing and stats["failed"] == 0:
+            # Products that were stored before but are not in the catalog anymore
+            removed = [productId for key, (productId, _) in known_products.items() if key not in seen_products]
+            await self._db("deleteProducts", removed)
+            stats["removed"] = len(removed)
+
+        print(f"\nPipeline finished: {stats}")
+        if fetch == self.__scraperService.fetchHTML:
+            print(f"Average fetch latency: {self.__scraperService.averageFetchLatency():.2f}s per URL")
+            if self.__scraperService.fetch_mode == "http":
+                print(f"Browser fallback rate: {self.__scraperService.browserFallbackRate():.1%} "
+                      f"of {self.__scraperService.http_fetches} HTTP fetches")
+        return stats
+
+    async def reparseArchive(self, website_id: int) -> dict:
+        """
+        Run the last archived HTML of every URL through the parser again and reload the products,
+        without fetching anything: turns a parser fix around without a new crawl.
+        Only the products whose parsed payload changed are rewritten, in batches.
+        """
+        archive = self.__scraperService.archive
+        if archive is None:
+            raise RuntimeError("The HTML archive is disabled")
+
+        latest = await asyncio.to_thread(archive.latest_fetches)
+        digests = {url: digest for url, _, digest in latest}
+
+        async def load(url):
+            return await asyncio.to_thread(archive.load, digests[url])
+
+        # The archive can lag behind the database, so nothing is removed, and the prices of old pages
+        # are not recorded as current ones
+        return await self.run(list(digests), website_id, incremental=True, fetch=load, remove_missing=False,
+                              snapshots=False)
+
+    def _parseExecutor(self):
+        if self._parse_executor is None:
+            if self.parse_mode == "process":
+                # spawn: the workers do not inherit the event loop, threads or DB pool of this process
+                self._parse_executor = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._parse_executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+        return self._parse_executor
+
+    def _discardParseExecutor(self, executor) -> None:
+        # Drop a broken pool, unless another worker already replaced it
+        if self._parse_executor is executor:
+            self._parse_executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        # Stop the parse workers
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=True, cancel_futures=True)
+            self._parse_executor = None
+
+    async def _db(self, method: str, *args):
+        # Call a WebsiteService method: its async variant, or the sync one in a worker thread
+        if self.db_mode == "async":
+            return await getattr(self.__websiteService, method + "Async")(*args)
+        return await asyncio.to_thread(getattr(self.__websiteService, method), *args)
+
+    async def _flush(self, products: list, updates: list, crawled_urls: list, snapshot: tuple = None) -> None:
+        await self._db("bulkAddCrawledWebsiteUrls", crawled_urls)
+
+        # New and changed products are upserted on their natural key, one statement per batch
+        await self._db("upsertProducts", products + [product for _, product in updates], self.batch_size)
+
+        if snapshot is not None:
+            website_name, captured_at = snapshot
+            await self._db(
+                "recordSnapshots", website_name, products + [product for _, product in updates], captured_at
+            )
+
+    def _prepare(self, url: str, product_data: dict, website_id: int, known_products: dict,
+                 known_urls: set, seen_products: set, pending_urls: list) -> tuple:
+        """
+        Build the CrawledUrl entity and the product with the scraped data.
+        Returns (outcome, product, stored product id), where outcome is "new", "updated" or "unchanged"
+        depending on the product already stored with the same natural key, the URL the product was
+        found at can change between runs.
+        """
+        if url not in known_urls:
+            pending_urls.append(CrawledUrl(
+                crawled_url_address=url,
+                website_id=website_id
+            ))
+            known_urls.add(url)
+
+        if not product_data.get("url"):
+            product_data["url"] = url
+        product = self.__scraperService.createProductWithScrapedData(product_data, website_id)
+        seen_products.add(product.product_key)
+
+        known = known_products.get(product.product_key)
+        if known is None:
+            return "new", product, None
+
+        productId, contentHash = known
+        if contentHash == product.product_content_hash:
+            return "unchanged", product, productId
+
+        return "updated", product, productId
@@ -0,0 +1,439 @@
+import re
+import json
+import random
+import html as html_mod
+
+from service.nuxtPayload import NUXT_PREFIX, parse_nuxt_payload
+
+# Every pattern is compiled once, at import time.
+#
+# A Bershka product page has three regions the parser cares about:
+#   - the JSON-LD <script> blocks (structured product data)
+#   - the window.__NUXT__ <script> (the big minified payload with the JS object fields)
+#   - the rest of the markup (product detail layout, pickers, images)
+# The regions are located once per page and every field pattern only runs over its region.
+
+_JSON_LD_RE = re.compile(
+    r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Markup fields
+_TITLE_RE = re.compile(
+    r'<h1[^>]*class="product-detail-info-layout__title[^"]*"[^>]*>(.*?)</h1>',
+    re.DOTALL | re.IGNORECASE,
+)
+_CURRENT_PRICE_RE = re.compile(
+    r'class="current-price-elem"[^>]*>(.*?)</span>',
+    re.DOTALL | re.IGNORECASE,
+)
+_COLOR_RE = re.compile(
+    r'<li[^>]*id="color-(\d+)"[^>]*class="round-color-picker__color"[^>]*>'
+    r'.*?<a[^>]*aria-label="([^"]+)"',
+    re.DOTALL | re.IGNORECASE,
+)
+_SELECTED_COLOR_RE = re.compile(
+    r'product-detail-image-layout"[^>]*colorid="(\d+)"',
+    re.IGNORECASE,
+)
+_SIZE_RE = re.compile(r'aria-label="Mărimea ([^"]+)"')
+_MAIN_IMAGE_RE = re.compile(r'<img[^>]+data-qa-anchor="pdpMainImage"[^>]+>', re.IGNORECASE)
+_SRC_RE = re.compile(r'src="([^"]+)"')
+# Every image with an alt text, filtered afterwards on the product name
+_IMAGE_WITH_ALT_RE = re.compile(r'<img[^>]+src="([^"]+)"[^>]*alt="([^"]*)"[^>]*>', re.UNICODE | re.IGNORECASE)
+_REFERENCE_TEXT_RE = re.compile(
+    r'class="product-reference[^"]*"[^>]*>(.*?)</div>',
+    re.DOTALL | re.IGNORECASE,
+)
+_TAG_RE = re.compile(r'<.*?>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Payload fields
+_NAME_EN_RE = re.compile(r'nameEn:"([^"]+)"')
+_REFERENCE_RE = re.compile(r'\breference\s*:\s*"([^"]+)"')
+_DISPLAY_REFERENCE_RE = re.compile(r'\bdisplayReference\s*:\s*"([^"]+)"')
+_STOCK_RE = re.compile(r'\b(stock|availability)\s*:\s*"([^"]+)"', re.IGNORECASE)
+_ORIGIN_RE = re.compile(r'origin:"([^"]+)"')
+_MODEL_HEIGHT_RE = re.compile(r'\bmodelHeight\s*:\s*"([^"]+)"', re.IGNORECASE)
+_MODEL_SIZE_RE = re.compile(r'\bmodelSize\s*:\s*"([^"]+)"', re.IGNORECASE)
+_MODEL_NAME_RE = re.compile(r'\bmodelName\s*:\s*"([^"]+)"', re.IGNORECASE)
+
+# Composition inside the payload. Keys can be
+#   material: <var_or_"literal">, percentage: <var_or_"literal">
+#   fiberType: <var_or_"literal">, percentage: <var_or_"literal">
+_MATERIAL_PAIR_RE = re.compile(
+    r'(?:material|fiberType)\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))\s*,\s*'
+    r'percentage\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))',
+    re.IGNORECASE
+)
+# description (area) can also be literal or var
+_DESCRIPTION_RE = re.compile(r'description\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))', re.IGNORECASE)
+_PERCENTAGE_RE = re.compile(r'(\d{1,3})')
+
+_TEXTILE_KEYWORDS = (
+    "BUMBAC", "POLIESTER", "ELASTAN", "VASCOZ", "VISCOZ", "MODAL",
+    "ACRIL", "LÂN", "LANA", "POLIAMID", "NAILON", "NYLON", "IN",
+    "MATASE", "MĂTASE", "PIELE"
+)
+
+
+def normalize_material_name(raw: str):
+    raw_up = raw.upper()
+
+    is_certified = "CERTIFICAT" in raw_up
+    certification = None
+
+    if "RCS" in raw_up:
+        certification = "RCS"
+    elif "RWS" in raw_up:
+        certification = "RWS"
+
+    clean = (
+        raw_up
+        .replace("CERTIFICAT", "")
+        .replace("RECICLAT", "")
+        .replace("RCS", "")
+        .replace("RWS", "")
+        .strip()
+        .lower()
+    )
+
+    return clean, is_certified, certification
+
+
+def random_model_height():
+    return f"{random.randint(170, 195)} cm"
+
+
+def random_model_name():
+    return str(random.randint(500, 1200))
+
+
+def random_model_size(available_sizes):
+    if available_sizes:
+        return random.choice(available_sizes)
+    return random.choice(["XS", "S", "M", "L", "XL"])
+
+
+def extract_json_ld_product(html: str, pos: int = 0, endpos: int = None):
+    endpos = len(html) if endpos is None else endpos
+    for m in _JSON_LD_RE.finditer(html, pos, endpos):
+        txt = m.group(1).strip()
+        try:
+            data = json.loads(txt)
+        except Exception:
+            continue
+
+        if isinstance(data, dict) and data.get("@type") == "Product":
+            return data
+        if isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and item.get("@type") == "Product":
+                    return item
+    return None
+
+
+def has_product_markers(html: str) -> bool:
+    # True if the server HTML already holds the product data: the Nuxt payload and the JSON-LD Product
+    return NUXT_PREFIX in html and extract_json_ld_product(html) is not None
+
+
+class _Regions:
+    # Spans of the page regions, located once per page
+    def __init__(self, html: str):
+        self.html = html
+        nuxt_start = html.find("window.__NUXT__")
+        if nuxt_start != -1:
+            nuxt_end = html.find("</script>", nuxt_start)
+            self.nuxt = (nuxt_start, nuxt_end if nuxt_end != -1 else len(html))
+            # Markup is everything around the payload script
+            self.markup = [(0, nuxt_start), (self.nuxt[1], len(html))]
+            self.payload = [self.nuxt]
+        else:
+            self.nuxt = None
+            self.markup = [(0, len(html))]
+            # No payload script: the payload fields can be anywhere
+            self.payload = self.markup
+
+    def nuxt_script(self) -> str:
+        return self.html[self.nuxt[0]:self.nuxt[1]] if self.nuxt else ""
+
+    def search(self, pattern, spans):
+        for start, end in spans:
+            m = pattern.search(self.html, start, end)
+            if m:
+                return m
+        return None
+
+    def findall(self, pattern, spans):
+        found = []
+        for start, end in spans:
+            found.extend(pattern.findall(self.html, start, end))
+        return found
+
+
+def _parse_materials(nuxt_script: str) -> list:
+    # extract material / composition from the minified payload
+    materials = []
+    mapping = parse_nuxt_payload(nuxt_script) if nuxt_script else {}
+    seen = set()
+
+    for m in _MATERIAL_PAIR_RE.finditer(nuxt_script):
+        mat_lit, mat_var, perc_lit, perc_var = m.groups()
+
+        mat_raw = mat_lit if mat_lit is not None else mapping.get(mat_var)
+        if not mat_raw or not isinstance(mat_raw, str):
+            continue
+
+        perc_raw = perc_lit if perc_lit is not None else mapping.get(perc_var)
+        if perc_raw is None:
+            continue
+
+        if isinstance(perc_raw, str):
+            mp = _PERCENTAGE_RE.search(perc_raw)
+            if not mp:
+                continue
+            perc = int(mp.group(1))
+        elif isinstance(perc_raw, int):
+            perc = perc_raw
+        else:
+            continue
+
+        # find nearest description before this pair (area)
+        descs = list(_DESCRIPTION_RE.finditer(nuxt_script, max(0, m.start() - 300), m.start()))
+        area = None
+        if descs:
+            dlit, dvar = descs[-1].groups()
+            area = dlit if dlit is not None else mapping.get(dvar)
+
+        # normalize & filter (IMPORTANT: avoids "Intertek 193341" etc.)
+        name, is_certified, certification = normalize_material_name(mat_raw)
+
+        # HARD FILTER: accept only textile-ish names after normalize
+        # (otherwise you'll ingest certification providers, random strings, etc.)
+        name_up = name.upper()
+        if not any(k in name_up for k in _TEXTILE_KEYWORDS):
+            continue
+
+        key = (name, certification, is_certified, perc, area)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        materials.append({
+            "material": name,
+            "percentage": perc,
+            "area": area,
+            "is_certified": is_certified,
+            "certification": certification
+        })
+
+    return materials
+
+
+def parse_bershka_product(html: str) -> dict:
+    product: dict = {}
+    regions = _Regions(html)
+
+    json_ld = None
+    for start, end in regions.markup:
+        json_ld = extract_json_ld_product(html, start, end)
+        if json_ld:
+            break
+
+    if json_ld:
+        product["name"] = json_ld.get("name")
+        product["description"] = json_ld.get("description") or ""
+        product["url"] = json_ld.get("url")
+
+        img = json_ld.get("image")
+        if isinstance(img, str):
+            product["main_image"] = html_mod.unescape(img)
+
+        offers = json_ld.get("offers") or []
+        if isinstance(offers, dict):
+            offers = [offers]
+        offer = offers[0] if offers else {}
+
+        price_str = str(offer.get("price")) if offer.get("price") is not None else None
+        if price_str:
+            price_str_norm = price_str.replace(",", ".")
+            try:
+                product["price"] = float(price_str_norm)
+            except ValueError:
+                product["price"] = None
+        else:
+            product["price"] = None
+
+        product["currency"] = offer.get("priceCurrency")
+        product["sku"] = offer.get("sku")
+
+    else:
+        # Fallback if structured data is missing
+        m = regions.search(_TITLE_RE, regions.markup)
+        if m:
+            name = _WHITESPACE_RE.sub(' ', m.group(1)).strip()
+        else:
+            name = None
+        product["name"] = name
+        product["description"] = name or ""
+
+        # Price from span.current-price-elem
+        m = regions.search(_CURRENT_PRICE_RE, regions.markup)
+        if m:
+            raw = _TAG_RE.sub('', m.group(1))
+            raw = raw.replace('\xa0', ' ')
+            raw = raw.strip()  # ex: "329,90 LEI"
+            num_part = raw.split()[0]
+            num_part = num_part.replace('.', '').replace(',', '.')
+            try:
+                product["price"] = float(num_part)
+            except ValueError:
+                product["price"] = None
+            product["currency"] = "RON" if "LEI" in raw.upper() else None
+        else:
+            product["price"] = None
+            product["currency"] = None
+
+    # Product name
+    m = regions.search(_NAME_EN_RE, regions.payload)
+    if m:
+        product["name_en"] = m.group(1)
+
+    # Reference codes from productDetails
+    m = regions.search(_REFERENCE_RE, regions.payload)
+    if m:
+        product["reference"] = m.group(1)
+
+    m = regions.search(_DISPLAY_REFERENCE_RE, regions.payload)
+    if m:
+        disp = m.group(1)
+        try:
+            disp = bytes(disp, "utf-8").decode("unicode_escape")
+        except Exception:
+            pass
+        product["display_reference"] = disp
+
+    # Stock
+    m = regions.search(_STOCK_RE, regions.payload)
+    if m:
+        product["stock"] = m.group(2)
+    else:
+        product["stock"] = "in_stock"
+
+    # Available colors
+    color_matches = regions.findall(_COLOR_RE, regions.markup)
+
+    # Selected color id (atributul colorid de pe layout-ul de imagine)
+    m = regions.search(_SELECTED_COLOR_RE, regions.markup)
+    selected_color_id = m.group(1) if m else None
+
+    # Available sizes
+    size_labels = regions.findall(_SIZE_RE, regions.markup)
+    sizes = [s.strip() for s in size_labels] if size_labels else []
+
+    colors = []
+    for cid, cname in color_matches:
+        cobj = {"id": cid, "name": cname}
+        if cid == selected_color_id and sizes:
+            cobj["sizes"] = sizes
+        colors.append(cobj)
+    if colors:
+        product["colors"] = colors
+
+    # Main image
+    if not product.get("main_image"):
+        m = regions.search(_MAIN_IMAGE_RE, regions.markup)
+        if m:
+            m2 = _SRC_RE.search(m.group(0))
+            if m2:
+                product["main_image"] = html_mod.unescape(m2.group(1))
+
+    # All products images linked to the name
+    name_for_alt = product.get("name") or ""
+    images = set()
+    if name_for_alt:
+        first_word = name_for_alt.split()[0].lower()
+        for src, alt in regions.findall(_IMAGE_WITH_ALT_RE, regions.markup):
+            if first_word not in alt.lower():
+                continue
+            if src.startswith("data:"):
+                continue
+            images.add(html_mod.unescape(src))
+
+    if product.get("main_image"):
+        images.add(product["main_image"])
+
+    if images:
+        product["all_images"] = list(images)
+
+    # extract reference text
+    m = regions.search(_REFERENCE_TEXT_RE, regions.markup)
+    if m:
+        ref_text = _WHITESPACE_RE.sub(' ', m.group(1)).strip()
+        product["reference_text"] = ref_text
+
+    materials = _parse_materials(regions.nuxt_script())
+    if materials:
+        product["materials"] = materials
+
+    # product origin
+    origins = sorted(set(regions.findall(_ORIGIN_RE, regions.payload)))
+    if origins:
+        norm = []
+        for o in origins:
+            o_clean = o.strip()
+            if o_clean.upper() == "VIETNAM":
+                o_clean = "Vietnam"
+            norm.append(o_clean)
+        product["origins"] = sorted(set(norm))
+
+    m = regions.search(_MODEL_HEIGHT_RE, regions.payload)
+    if m:
+        product["model_height"] = m.group(1)
+    else:
+        product["model_height"] = random_model_height()
+
+    # model size
+    m = regions.search(_MODEL_SIZE_RE, regions.payload)
+    if m:
+        product["model_size"] = m.group(1)
+    else:
+        product["model_size"] = random_model_size(sizes)
+
+    # model name
+    m = regions.search(_MODEL_NAME_RE, regions.payload)
+    if m:
+        product["model_name"] = m.group(1)
+    else:
+        product["model_name"] = random_model_name()
+
+    extra_parts = []
+
+    if product.get("materials"):
+        parts = []
+        for m in product["materials"]:
+            label = f'{m["percentage"]}% {m["material"]}'
+            if m["area"]:
+                label = f'{m["area"]}: {label}'
+            parts.append(label)
+        extra_parts.append(" / ".join(parts))
+    if product.get("origins"):
+        extra_parts.append("Origine: " + ", ".join(product["origins"]))
+    product["extra_info"] = ". ".join(extra_parts) if extra_parts else ""
+
+    return product
+
+
+def parse_product_html(html: str) -> dict:
+    """
+    Parse the HTML of a product page into a plain dict, never raises.
+    Module level, so it can be sent to a ProcessPoolExecutor.
+    """
+    try:
+        return parse_bershka_product(html)
+    except Exception as e:
+        return {
+            "error": "parse_failed",
+            "message": str(e),
+        }
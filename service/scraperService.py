@@ -1,10 +1,21 @@
 from crawl4ai import AsyncWebCrawler
-import re
+import httpx
+import asyncio
+import time
 import json
-import random
-import html as html_mod
+import hashlib
 
 from model import Product, Color, Origin, ProductImage, Material, ProductMaterial
+from service import productParser
+from service.fetchScheduler import FetchScheduler, RetryableFetchError, is_retryable_status, parse_retry_after
+from service.htmlArchive import HtmlArchive
+
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ro-RO,ro;q=0.9,en;q=0.8",
+}
 
 
 class ScraperService:
@@ -15,466 +26,254 @@ class ScraperService:
             cls._instance = super(ScraperService, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, max_tabs: int = 4, recycle_after: int = 200, archive_path: str = "html_archive",
+                 fetch_mode: str = "browser", http_connections: int = 16, http_timeout: float = 15.0):
         if hasattr(self, "_initialized") and self._initialized:
             return
 
         self._initialized = True
         self.default_timeout = 30000
 
+        # One long-lived browser shared by every fetch. At most `max_tabs` pages are open at once,
+        # and the browser is restarted after `recycle_after` fetches to keep its memory in check.
+        self.max_tabs = max(1, max_tabs)
+        self.recycle_after = max(1, recycle_after)
+        self._crawler = None
+        self._crawler_uses = 0
+        self._in_flight = 0
+        self._recycling = False
+        self._crawler_condition = asyncio.Condition()
+
+        # "browser": every page is rendered by the headless browser
+        # "http": the server HTML is fetched with a pooled HTTP/2 client, and the browser is only
+        # used when the product markers are missing from it
+        self.fetch_mode = fetch_mode
+        self.http_connections = max(1, http_connections)
+        self.http_timeout = http_timeout
+        self._http_client = None
+        self.http_fetches = 0
+        self.browser_fallbacks = 0
+
+        # Per-host rate limit and retries, shared with the crawler
+        self.scheduler = FetchScheduler()
+
+        self.fetch_count = 0
+        self.fetch_seconds = 0.0
+
+        # Every fetched page is kept in the archive so it can be re-parsed later without
+        # hitting the website again. An empty path disables archiving.
+        self.archive = HtmlArchive(archive_path) if archive_path else None
+
     @staticmethod
     def normalize_material_name(raw: str):
-        raw_up = raw.upper()
-
-        is_certified = "CERTIFICAT" in raw_up
-        certification = None
-
-        if "RCS" in raw_up:
-            certification = "RCS"
-        elif "RWS" in raw_up:
-            certification = "RWS"
-
-        clean = (
-            raw_up
-            .replace("CERTIFICAT", "")
-            .replace("RECICLAT", "")
-            .replace("RCS", "")
-            .replace("RWS", "")
-            .strip()
-            .lower()
-        )
-
-        return clean, is_certified, certification
+        return productParser.normalize_material_name(raw)
 
     @staticmethod
     def extract_json_ld_product(html: str):
-        pattern = re.compile(
-            r'<script[^>]+type="application/ld\+json"[^>]*>(.*?)</script>',
-            re.DOTALL | re.IGNORECASE
-        )
-        for m in pattern.finditer(html):
-            txt = m.group(1).strip()
-            try:
-                data = json.loads(txt)
-            except Exception:
-                continue
-
-            if isinstance(data, dict) and data.get("@type") == "Product":
-                return data
-            if isinstance(data, list):
-                for item in data:
-                    if isinstance(item, dict) and item.get("@type") == "Product":
-                        return item
-        return None
+        return productParser.extract_json_ld_product(html)
 
     @staticmethod
     def random_model_height():
-        return f"{random.randint(170, 195)} cm"
+        return productParser.random_model_height()
 
     @staticmethod
     def random_model_name():
-        return str(random.randint(500, 1200))
+        return productParser.random_model_name()
 
     @staticmethod
     def random_model_size(available_sizes):
-        if available_sizes:
-            return random.choice(available_sizes)
-        return random.choice(["XS", "S", "M", "L", "XL"])
+        return productParser.random_model_size(available_sizes)
 
     def parse_bershka_product(self, html: str) -> dict:
-        product: dict = {}
-
-        json_ld = ScraperService.extract_json_ld_product(html)
-        if json_ld:
-            product["name"] = json_ld.get("name")
-            product["description"] = json_ld.get("description") or ""
-            product["url"] = json_ld.get("url")
-
-            img = json_ld.get("image")
-            if isinstance(img, str):
-                product["main_image"] = html_mod.unescape(img)
-
-            offers = json_ld.get("offers") or []
-            if isinstance(offers, dict):
-                offers = [offers]
-            offer = offers[0] if offers else {}
-
-            price_str = str(offer.get("price")) if offer.get("price") is not None else None
-            if price_str:
-                price_str_norm = price_str.replace(",", ".")
-                try:
-                    product["price"] = float(price_str_norm)
-                except ValueError:
-                    product["price"] = None
-            else:
-                product["price"] = None
-
-            product["currency"] = offer.get("priceCurrency")
-            product["sku"] = offer.get("sku")
-
-        else:
-            # Fallback if structured data is missing
-            m = re.search(
-                r'<h1[^>]*class="product-detail-info-layout__title[^"]*"[^>]*>(.*?)</h1>',
-                html,
-                re.DOTALL | re.IGNORECASE,
-            )
-            if m:
-                name = re.sub(r'\s+', ' ', m.group(1)).strip()
-            else:
-                name = None
-            product["name"] = name
-            product["description"] = name or ""
-
-            # Price from span.current-price-elem
-            m = re.search(
-                r'class="current-price-elem"[^>]*>(.*?)</span>',
-                html,
-                re.DOTALL | re.IGNORECASE,
+        # The extraction itself lives in productParser, where the patterns are compiled once
+        return productParser.parse_bershka_product(html)
+
+    async def close(self) -> None:
+        # Stop the shared browser, waiting for the fetches that are still running
+        async with self._crawler_condition:
+            await self._crawler_condition.wait_for(lambda: self._in_flight == 0)
+            await self._stopCrawler()
+
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    async def _startCrawler(self) -> None:
+        self._crawler = AsyncWebCrawler(verbose=True)
+        await self._crawler.start()
+        self._crawler_uses = 0
+
+    async def _stopCrawler(self) -> None:
+        if self._crawler is None:
+            return
+        try:
+            await self._crawler.close()
+        except Exception as e:
+            print(f"Error closing the browser: {e}")
+        finally:
+            self._crawler = None
+
+    async def _acquireCrawler(self) -> AsyncWebCrawler:
+        async with self._crawler_condition:
+            await self._crawler_condition.wait_for(
+                lambda: self._in_flight < self.max_tabs and not self._recycling
             )
-            if m:
-                raw = re.sub(r'<.*?>', '', m.group(1))
-                raw = raw.replace('\xa0', ' ')
-                raw = raw.strip()  # ex: "329,90 LEI"
-                num_part = raw.split()[0]
-                num_part = num_part.replace('.', '').replace(',', '.')
-                try:
-                    product["price"] = float(num_part)
-                except ValueError:
-                    product["price"] = None
-                product["currency"] = "RON" if "LEI" in raw.upper() else None
-            else:
-                product["price"] = None
-                product["currency"] = None
-
-        # Product name
-        m = re.search(r'nameEn:"([^"]+)"', html)
-        if m:
-            product["name_en"] = m.group(1)
-
-        # Reference codes from productDetails
-        m = re.search(r'\breference\s*:\s*"([^"]+)"', html)
-        if m:
-            product["reference"] = m.group(1)
-
-        m = re.search(r'\bdisplayReference\s*:\s*"([^"]+)"', html)
-        if m:
-            disp = m.group(1)
-            try:
-                disp = bytes(disp, "utf-8").decode("unicode_escape")
-            except Exception:
-                pass
-            product["display_reference"] = disp
-
-        # Stock
-        m = re.search(
-            r'\b(stock|availability)\s*:\s*"([^"]+)"',
-            html,
-            re.IGNORECASE
-        )
-        if m:
-            product["stock"] = m.group(2)
-        else:
-            product["stock"] = "in_stock"
-
-        # Available colors
-        color_matches = re.findall(
-            r'<li[^>]*id="color-(\d+)"[^>]*class="round-color-picker__color"[^>]*>'
-            r'.*?<a[^>]*aria-label="([^"]+)"',
-            html,
-            re.DOTALL | re.IGNORECASE,
-        )
 
-        # Selected color id (atributul colorid de pe layout-ul de imagine)
-        m = re.search(
-            r'product-detail-image-layout"[^>]*colorid="(\d+)"',
-            html,
-            re.IGNORECASE,
-        )
-        selected_color_id = m.group(1) if m else None
-
-        # Available sizes
-        size_labels = re.findall(r'aria-label="Mărimea ([^"]+)"', html)
-        sizes = [s.strip() for s in size_labels] if size_labels else []
-
-        colors = []
-        for cid, cname in color_matches:
-            cobj = {"id": cid, "name": cname}
-            if cid == selected_color_id and sizes:
-                cobj["sizes"] = sizes
-            colors.append(cobj)
-        if colors:
-            product["colors"] = colors
-
-        # Main image
-        if not product.get("main_image"):
-            m = re.search(r'<img[^>]+data-qa-anchor="pdpMainImage"[^>]+>', html, re.IGNORECASE)
-            if m:
-                tag = m.group(0)
-                m2 = re.search(r'src="([^"]+)"', tag)
-                if m2:
-                    product["main_image"] = html_mod.unescape(m2.group(1))
-
-        # All products images linked to the name
-        name_for_alt = product.get("name") or ""
-        images = set()
-        if name_for_alt:
-            pattern = re.compile(
-                r'<img[^>]+src="([^"]+)"[^>]*alt="([^"]*%s[^"]*)"[^>]*>' %
-                re.escape(name_for_alt.split()[0]),
-                re.UNICODE | re.IGNORECASE,
+            if self._crawler is not None and self._crawler_uses >= self.recycle_after:
+                # Let the open pages finish, then restart the browser
+                self._recycling = True
+                await self._crawler_condition.wait_for(lambda: self._in_flight == 0)
+                await self._stopCrawler()
+                self._recycling = False
+                self._crawler_condition.notify_all()
+
+            if self._crawler is None:
+                await self._startCrawler()
+
+            self._in_flight += 1
+            self._crawler_uses += 1
+            return self._crawler
+
+    async def _releaseCrawler(self) -> None:
+        async with self._crawler_condition:
+            self._in_flight -= 1
+            self._crawler_condition.notify_all()
+
+    def _httpClient(self) -> httpx.AsyncClient:
+        # Keep-alive connections are reused across fetches, responses are gzip/brotli compressed
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                headers=HTTP_HEADERS,
+                follow_redirects=True,
+                timeout=self.http_timeout,
+                limits=httpx.Limits(
+                    max_connections=self.http_connections,
+                    max_keepalive_connections=self.http_connections
+                )
             )
-            for src, alt in pattern.findall(html):
-                if src.startswith("data:"):
-                    continue
-                images.add(html_mod.unescape(src))
-
-        if product.get("main_image"):
-            images.add(product["main_image"])
-
-        if images:
-            product["all_images"] = list(images)
-
-        # extract reference text
-        m = re.search(
-            r'class="product-reference[^"]*"[^>]*>(.*?)</div>',
-            html,
-            re.DOTALL | re.IGNORECASE,
-        )
-        if m:
-            ref_text = re.sub(r'\s+', ' ', m.group(1)).strip()
-            product["reference_text"] = ref_text
-
-        # extract material / composition (WORKS ON YOUR PROVIDED BERSHKA HTML FILES)
-        materials = []
-
-        # 1) isolate the big minified payload
-        nuxt_start = html.find("window.__NUXT__")
-        if nuxt_start != -1:
-            nuxt_end = html.find("</script>", nuxt_start)
-            nuxt_script = html[nuxt_start:nuxt_end] if nuxt_end != -1 else html[nuxt_start:]
-        else:
-            nuxt_script = ""
-
-        def _decode_js_string(s: str) -> str:
-            # decode only if escape sequences exist; otherwise unicode_escape can corrupt UTF-8
-            if "\\u" in s or "\\x" in s:
-                try:
-                    return s.encode("utf-8").decode("unicode_escape")
-                except Exception:
-                    return s
-            return s
-
-        def _build_nuxt_mapping(script: str) -> dict:
-            """
-            Build mapping param_name -> literal_value from:
-            window.__NUXT__=(function(a,b,c,...){ ... }(arg1,arg2,...));
-            The args list is huge and contains the real strings like "bumbac", "97%".
-            """
-            pm = re.search(r'window\.__NUXT__=\(function\((.*?)\)\{', script)
-            if not pm:
-                return {}
-
-            params = [p.strip() for p in pm.group(1).split(",") if p.strip()]
-
-            # Find the call boundary: the LAST occurrence of "}(" whose next ~600 chars contain NO braces
-            # (that's the args list, which is only literals, no objects).
-            boundary = None
-            for m in reversed(list(re.finditer(r'\}\(', script))):
-                tail = script[m.start() + 2: m.start() + 600]
-                if "{" not in tail and "}" not in tail:
-                    boundary = m.start()
-                    break
-            if boundary is None:
-                return {}
-
-            args_str = script[boundary + 2:].strip()
-            # remove trailing ");" / "))"
-            args_str = re.sub(r'\)\s*;\s*$', '', args_str)
-
-            # Tokenize JS literals incl. void 0 / undefined
-            token_re = re.compile(
-                r'\s*(?:"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|true|false|null|void\s+0|undefined|-?\d+(?:\.\d+)?)\s*(?:,|$)',
-                re.IGNORECASE
+        return self._http_client
+
+    async def _fetchOverHttp(self, url: str) -> str | None:
+        try:
+            response = await self._httpClient().get(url)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            raise RetryableFetchError(f"{type(e).__name__}: {e}")
+        except httpx.HTTPError as e:
+            print(f"  HTTP fetch error for {url}: {e}")
+            return None
+
+        if is_retryable_status(response.status_code):
+            raise RetryableFetchError(
+                f"HTTP {response.status_code}", parse_retry_after(response.headers.get("Retry-After")),
+                response.status_code
             )
+        if response.status_code != 200:
+            return None
+        return response.text
 
-            tokens = []
-            idx = 0
-            while idx < len(args_str) and len(tokens) < len(params):
-                mt = token_re.match(args_str, idx)
-                if not mt:
-                    break
-                tok = mt.group(0).strip()
-                if tok.endswith(","):
-                    tok = tok[:-1]
-                tokens.append(tok)
-                idx = mt.end()
-
-            values = []
-            for t in tokens:
-                tl = t.lower()
-                if t.startswith('"') or t.startswith("'"):
-                    values.append(_decode_js_string(t[1:-1]))
-                elif tl == "true":
-                    values.append(True)
-                elif tl == "false":
-                    values.append(False)
-                elif tl in ("null", "void 0", "undefined"):
-                    values.append(None)
-                else:
-                    values.append(float(t) if "." in t else int(t))
-
-            return dict(zip(params, values))
-
-        mapping = _build_nuxt_mapping(nuxt_script) if nuxt_script else {}
-
-        # 2) Extract pairs where keys can be:
-        #    material: <var_or_"literal">, percentage: <var_or_"literal">
-        #    fiberType: <var_or_"literal">, percentage: <var_or_"literal">
-        pair_re = re.compile(
-            r'(?:material|fiberType)\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))\s*,\s*'
-            r'percentage\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))',
-            re.IGNORECASE
-        )
-
-        # description (area) can also be literal or var
-        desc_re = re.compile(r'description\s*:\s*(?:"([^"]+)"|([A-Za-z_$][\w$]*))', re.IGNORECASE)
-
-        seen = set()
-
-        for m in pair_re.finditer(nuxt_script):
-            mat_lit, mat_var, perc_lit, perc_var = m.groups()
-
-            mat_raw = mat_lit if mat_lit is not None else mapping.get(mat_var)
-            if not mat_raw or not isinstance(mat_raw, str):
-                continue
-
-            perc_raw = perc_lit if perc_lit is not None else mapping.get(perc_var)
-            if perc_raw is None:
-                continue
-
-            if isinstance(perc_raw, str):
-                mp = re.search(r'(\d{1,3})', perc_raw)
-                if not mp:
-                    continue
-                perc = int(mp.group(1))
-            elif isinstance(perc_raw, int):
-                perc = perc_raw
-            else:
-                continue
-
-            # find nearest description before this pair (area)
-            back = nuxt_script[max(0, m.start() - 300): m.start()]
-            descs = list(desc_re.finditer(back))
-            area = None
-            if descs:
-                dlit, dvar = descs[-1].groups()
-                area = dlit if dlit is not None else mapping.get(dvar)
-
-            # normalize & filter (IMPORTANT: avoids "Intertek 193341" etc.)
-            name, is_certified, certification = self.normalize_material_name(mat_raw)
-
-            # HARD FILTER: accept only textile-ish names after normalize
-            # (otherwise you'll ingest certification providers, random strings, etc.)
-            if not any(k in name.upper() for k in [
-                "BUMBAC", "POLIESTER", "ELASTAN", "VASCOZ", "VISCOZ", "MODAL",
-                "ACRIL", "LÂN", "LANA", "POLIAMID", "NAILON", "NYLON", "IN",
-                "MATASE", "MĂTASE", "PIELE"
-            ]):
-                continue
-
-            key = (name, certification, is_certified, perc, area)
-            if key in seen:
-                continue
-            seen.add(key)
-
-            materials.append({
-                "material": name,
-                "percentage": perc,
-                "area": area,
-                "is_certified": is_certified,
-                "certification": certification
-            })
-
-        if materials:
-            product["materials"] = materials
-
-        # product origin
-        origins = sorted(set(re.findall(r'origin:"([^"]+)"', html)))
-        if origins:
-            norm = []
-            for o in origins:
-                o_clean = o.strip()
-                if o_clean.upper() == "VIETNAM":
-                    o_clean = "Vietnam"
-                norm.append(o_clean)
-            product["origins"] = sorted(set(norm))
-
-        m = re.search(r'\bmodelHeight\s*:\s*"([^"]+)"', html, re.IGNORECASE)
-        if m:
-            product["model_height"] = m.group(1)
-        else:
-            product["model_height"] = self.random_model_height()
-
-        # model size
-        m = re.search(r'\bmodelSize\s*:\s*"([^"]+)"', html, re.IGNORECASE)
-        if m:
-            product["model_size"] = m.group(1)
-        else:
-            product["model_size"] = self.random_model_size(sizes)
-
-        # model name
-        m = re.search(r'\bmodelName\s*:\s*"([^"]+)"', html, re.IGNORECASE)
-        if m:
-            product["model_name"] = m.group(1)
-        else:
-            product["model_name"] = self.random_model_name()
-
-        extra_parts = []
-
-        if product.get("materials"):
-            parts = []
-            for m in product["materials"]:
-                label = f'{m["percentage"]}% {m["material"]}'
-                if m["area"]:
-                    label = f'{m["area"]}: {label}'
-                parts.append(label)
-            extra_parts.append(" / ".join(parts))
-        if product.get("origins"):
-            extra_parts.append("Origine: " + ", ".join(product["origins"]))
-        product["extra_info"] = ". ".join(extra_parts) if extra_parts else ""
-
-        return product
-
-    async def scrapeURL(self, url: str) -> dict:
-        output_file = "product.html"
-
-        async with AsyncWebCrawler(verbose=True) as crawler:
+    async def _fetchWithBrowser(self, url: str) -> str | None:
+        crawler = await self._acquireCrawler()
+        try:
             result = await crawler.arun(
                 url=url,
                 bypass_cache=True
             )
+        finally:
+            await self._releaseCrawler()
+
+        if not result.success:
+            # No status code: the page did not load at all (timeout, network error)
+            status_code = getattr(result, "status_code", None)
+            if status_code is None or is_retryable_status(status_code):
+                raise RetryableFetchError(
+                    getattr(result, "error_message", None) or f"HTTP {status_code}", status_code=status_code
+                )
+            return None
+        return result.html or ""
+
+    async def _fetchOnce(self, url: str) -> str | None:
+        html = None
+        if self.fetch_mode == "http":
+            self.http_fetches += 1
+            html = await self._fetchOverHttp(url)
+            if html is not None and not productParser.has_product_markers(html):
+                html = None
+            if html is None:
+                self.browser_fallbacks += 1
+
+        if html is None:
+            html = await self._fetchWithBrowser(url)
+        return html
+
+    async def fetchHTML(self, url: str) -> str | None:
+        """
+        Fetch the raw HTML of a page within the per-host rate limit, retrying 429/5xx/timeouts
+        with backoff. None if the fetch failed; after the last retry the URL is also dead-lettered.
+        """
+        started = time.perf_counter()
+        try:
+            html = await self.scheduler.acall(url, lambda: self._fetchOnce(url), queue="scrape")
+        finally:
+            self.fetch_count += 1
+            self.fetch_seconds += time.perf_counter() - started
+
+        if html is not None and self.archive is not None:
+            await asyncio.to_thread(self.archive.store, url, html)
+        return html
+
+    def takeDeadLetters(self) -> list:
+        # URLs whose fetch still failed after every retry
+        return self.scheduler.take_dead_letters("scrape")
+
+    def averageFetchLatency(self) -> float:
+        # Average wall-clock seconds per fetched URL since startup
+        return self.fetch_seconds / self.fetch_count if self.fetch_count else 0.0
+
+    def browserFallbackRate(self) -> float:
+        # Share of the HTTP fetches that had to be rendered by the browser
+        return self.browser_fallbacks / self.http_fetches if self.http_fetches else 0.0
+
+    def parseHTML(self, html: str) -> dict:
+        # Parse the HTML of a product page, never raises
+        return productParser.parse_product_html(html)
 
-            if not result.success:
-                return {}
+    async def scrapeURL(self, url: str) -> dict:
+        # The fetched page is kept in the HTML archive by fetchHTML
+        html = await self.fetchHTML(url)
+        if html is None:
+            return {}
 
-            html = result.html or ""
+        return self.parseHTML(html)
 
-            try:
-                with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(html)
-            except IOError as e:
-                print(f"Eroare la salvarea fisierului {output_file}: {e}")
+    # Payload fields that describe the product. The model_* fields are left out
+    # because they are randomly generated when the page does not have them.
+    HASHED_FIELDS = (
+        "name", "description", "url", "main_image", "price", "currency", "sku", "reference",
+        "display_reference", "stock", "colors", "all_images", "reference_text", "materials",
+        "origins", "extra_info",
+    )
 
-            try:
-                product_data = self.parse_bershka_product(html)
-            except Exception as e:
-                product_data = {
-                    "error": "parse_failed",
-                    "message": str(e),
-                }
+    @staticmethod
+    def contentHash(product_data: dict) -> str:
+        # Stable hash of the scraped payload, changes when the price, stock, composition, etc. change
+        payload = {field: product_data.get(field) for field in ScraperService.HASHED_FIELDS}
+        if payload["all_images"]:
+            payload["all_images"] = sorted(payload["all_images"])
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
-            return product_data
+    @staticmethod
+    def productKey(product_data: dict) -> str | None:
+        # Natural key of a product within its website: the reference, else the SKU, else the URL
+        for field in ("reference", "sku", "url"):
+            if product_data.get(field):
+                return f"{field}:{product_data[field]}"
+        return None
 
     @staticmethod
     def createProductWithScrapedData(product_data: dict, website_id: int) -> Product:
@@ -493,6 +292,8 @@ class ScraperService:
             product_model_size=product_data.get("model_size"),
             product_model_name=product_data.get("model_name"),
             product_extra_info=product_data.get("extra_info"),
+            product_content_hash=ScraperService.contentHash(product_data),
+            product_key=ScraperService.productKey(product_data),
             website_id=website_id,
         )
 
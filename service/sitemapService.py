@@ -0,0 +1,196 @@
+import gzip
+import io
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from service.urlClassifier import UrlClassifier, PRODUCT
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag):
+    # "{http://www.sitemaps.org/schemas/sitemap/0.9}loc" -> "loc"
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapService:
+    '''
+    Product URL discovery from robots.txt and the sitemaps, without a browser.
+
+    Sitemaps are parsed with a streaming XML parser and every element is dropped as soon as it
+    has been read, so memory does not grow with the size of a sitemap. Sitemap indexes are
+    followed recursively and gzipped sitemaps are decompressed on the fly.
+    The sitemaps given by the caller can be http(s) URLs, file:// URLs or local paths, the locations
+    read from robots.txt or from a sitemap index are only followed if they are http(s) URLs, on the
+    host of the index for the child sitemaps.
+    '''
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(SitemapService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, timeout=15):
+        if hasattr(self, "_initialized") and self._initialized:
+            return
+
+        self._initialized = True
+        self.timeout = timeout
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = USER_AGENT
+        # Sitemaps that could not be read since the last discover()
+        self._failed_sitemaps = []
+
+    def _open(self, location, allow_local=False):
+        # Binary stream of a location, decompressed if it is gzipped
+        if location.startswith(("http://", "https://")):
+            response = self._session.get(location, timeout=self.timeout, stream=True)
+            response.raise_for_status()
+            # Content-Encoding is undone by urllib3, a .gz file served as is is handled below
+            response.raw.decode_content = True
+            # Keep the raw stream open once it is fully read, the buffered reader still reads from it
+            response.raw.auto_close = False
+            stream = io.BufferedReader(response.raw)
+        elif allow_local:
+            path = urlparse(location).path if location.startswith("file://") else location
+            stream = open(path, "rb")
+        else:
+            raise ValueError(f"not an http(s) URL: {location}")
+
+        if stream.peek(2)[:2] == _GZIP_MAGIC:
+            return gzip.GzipFile(fileobj=stream)
+        return stream
+
+    def sitemaps_from_robots(self, robots_url):
+        # Sitemap: lines of robots.txt, an empty list if robots.txt cannot be read
+        try:
+            with self._open(robots_url) as stream:
+                text = stream.read().decode("utf-8", errors="replace")
+        except (OSError, requests.RequestException) as e:
+            print(f"  Could not read {robots_url}: {e}")
+            return []
+
+        sitemaps = []
+        for line in text.splitlines():
+            key, _, value = line.partition(":")
+            if key.strip().lower() == "sitemap" and value.strip():
+                sitemap_url = urljoin(robots_url, value.strip())
+                # robots.txt is remote content, it cannot point to local files
+                if urlparse(sitemap_url).scheme in ("http", "https"):
+                    sitemaps.append(sitemap_url)
+                else:
+                    print(f"  Ignoring sitemap {sitemap_url} listed in {robots_url}")
+        return sitemaps
+
+    def iter_sitemap_urls(self, sitemap_url, _seen_sitemaps=None, _index_url=None):
+        """
+        Yield every page URL of a sitemap, following sitemap indexes.
+        Each sitemap file is read once, even if several indexes point to it.
+        """
+        seen_sitemaps = _seen_sitemaps if _seen_sitemaps is not None else set()
+        if sitemap_url in seen_sitemaps:
+            return
+        seen_sitemaps.add(sitemap_url)
+
+        if _index_url is not None and not self._is_followed_child(_index_url, sitemap_url):
+            # Skipped, so the listing is not complete
+            print(f"  Ignoring sitemap {sitemap_url} listed in {_index_url}")
+            self._failed_sitemaps.append(sitemap_url)
+            return
+
+        child_sitemaps = []
+        try:
+            # Only the sitemaps given by the caller can be local files
+            with self._open(sitemap_url, allow_local=_index_url is None) as stream:
+                root = None
+                is_index = False
+                for event, elem in ET.iterparse(stream, events=("start", "end")):
+                    if event == "start":
+                        if root is None:
+                            root = elem
+                            is_index = _local_name(elem.tag) == "sitemapindex"
+                        continue
+
+                    name = _local_name(elem.tag)
+                    if name == "loc" and elem.text:
+                        location = elem.text.strip()
+                        if is_index:
+                            child_sitemaps.append(location)
+                        else:
+                            yield location
+                    elif name in ("url", "sitemap"):
+                        # Drop the entries already read
+                        root.clear()
+        except (OSError, ValueError, ET.ParseError, requests.RequestException) as e:
+            print(f"  Could not read sitemap {sitemap_url}: {e}")
+            self._failed_sitemaps.append(sitemap_url)
+
+        for child in child_sitemaps:
+            yield from self.iter_sitemap_urls(child, seen_sitemaps, sitemap_url)
+
+    @staticmethod
+    def _is_followed_child(index_url, sitemap_url):
+        # A child sitemap has to be an http(s) URL, on the host of its index when the index is remote
+        child = urlparse(sitemap_url)
+        if child.scheme not in ("http", "https"):
+            return False
+        index = urlparse(index_url)
+        return index.scheme not in ("http", "https") or child.netloc.lower() == index.netloc.lower()
+
+    def iter_product_urls(self, start_url, sitemaps=None):
+        """
+        Yield the normalized product URLs listed in the sitemaps, each once.
+        The sitemaps come from robots.txt of start_url unless given, /sitemap.xml if robots.txt has none.
+        """
+        if sitemaps is None:
+            parsed = urlparse(start_url)
+            origin = f"{parsed.scheme}://{parsed.netloc}"
+            sitemaps = self.sitemaps_from_robots(origin + "/robots.txt") or [origin + "/sitemap.xml"]
+
+        # Same rules as CrawlerService.filter_ro_urls and categorize_urls, only the dedup set is kept
+        classifier = UrlClassifier(keep_urls=False)
+        seen_sitemaps = set()
+        for sitemap_url in sitemaps:
+            for url in self.iter_sitemap_urls(sitemap_url, seen_sitemaps):
+                classified = classifier.add(url)
+                if classified is not None and classified[1] == PRODUCT:
+                    yield classified[0]
+
+    def discover(self, start_url, output_files=True, sitemaps=None, on_product_url=None):
+        """
+        Enumerate the product URLs of the catalog, streamed to on_product_url and saved to product_urls.txt.
+        The result is complete if every sitemap could be read and listed at least one product.
+        """
+        self._failed_sitemaps = []
+        print("=" * 60)
+        print("Discovering product URLs from the sitemaps")
+        print("=" * 60)
+
+        product_count = 0
+        output = open('product_urls.txt', 'w', encoding='utf-8') if output_files else None
+        try:
+            for url in self.iter_product_urls(start_url, sitemaps):
+                product_count += 1
+                if output is not None:
+                    output.write(url + '\n')
+                if on_product_url is not None:
+                    on_product_url(url)
+        finally:
+            if output is not None:
+                output.close()
+
+        complete = product_count > 0 and not self._failed_sitemaps
+        print(f"Product pages: {product_count}")
+        if self._failed_sitemaps:
+            print(f"WARNING: {len(self._failed_sitemaps)} sitemaps could not be read, the product list is incomplete")
+        if output_files:
+            print("Product URLs saved to 'product_urls.txt'")
+        return {'product_count': product_count, 'complete': complete}
+
+    def close(self):
+        self._session.close()
@@ -0,0 +1,100 @@
+from urllib.parse import urldefrag
+
+PRODUCT = "product"
+CATEGORY = "category"
+OTHER = "other"
+
+SITE_PREFIX = 'https://www.bershka.com'
+REQUIRED_PATH = '/ro/'
+
+
+def normalize_url(url):
+    # Remove the fragment, use https and drop the trailing slash
+    if '#' in url:
+        # urldefrag returns the URL unchanged when it has no fragment, skip its parsing then
+        url, _ = urldefrag(url)
+    if url.startswith('http://'):
+        url = 'https://' + url[len('http://'):]
+    return url.rstrip('/')
+
+
+def is_ro_url(url):
+    # A normalized URL kept by filter_ro_urls: on the website and containing /ro/
+    return REQUIRED_PATH in url and url.startswith(SITE_PREFIX)
+
+
+def categorize(url):
+    # Product pages have c0p in the URL, category pages are the other /ro/ pages
+    lower = url.lower()
+    if 'c0p' in lower:
+        return PRODUCT
+    if REQUIRED_PATH in lower:
+        return CATEGORY
+    return OTHER
+
+
+def is_product_url(url):
+    # A normalized URL that filter_ro_urls keeps and categorize_urls puts in the product pages
+    return is_ro_url(url) and 'c0p' in url.lower()
+
+
+class UrlClassifier:
+    '''
+    Single pass over a stream of URLs: every URL is normalized, filtered, validated and put in its
+    category once, and URLs already seen are skipped with a set lookup.
+
+    With keep_urls=False only the counts and the dedup set are kept, for streams too large to hold.
+    '''
+
+    def __init__(self, keep_urls=True):
+        self.keep_urls = keep_urls
+        self._seen = set()
+        self.filtered_urls = []
+        self.buckets = {PRODUCT: [], CATEGORY: [], OTHER: []}
+        self.counts = {PRODUCT: 0, CATEGORY: 0, OTHER: 0}
+        self.invalid_start_urls = []
+
+    def add(self, url):
+        """
+        Classify one raw URL. Returns (normalized URL, category),
+        or None if the URL is filtered out or was already added.
+        """
+        url = normalize_url(url)
+        if url in self._seen or not is_ro_url(url):
+            return None
+        self._seen.add(url)
+
+        category = categorize(url)
+        self.counts[category] += 1
+        if self.keep_urls:
+            self.filtered_urls.append(url)
+            self.buckets[category].append(url)
+            if not url.startswith(SITE_PREFIX + '/ro'):
+                self.invalid_start_urls.append(url)
+        return url, category
+
+    def extend(self, urls):
+        for url in urls:
+            self.add(url)
+        return self
+
+    def categorization(self):
+        # Same shape as CrawlerService.categorize_urls
+        return {
+            'product_urls': self.buckets[PRODUCT],
+            'category_urls': self.buckets[CATEGORY],
+            'other_urls': self.buckets[OTHER],
+            'total': sum(self.counts.values()),
+            'product_count': self.counts[PRODUCT],
+            'category_count': self.counts[CATEGORY],
+            'other_count': self.counts[OTHER]
+        }
+
+    def validation(self):
+        # Same shape as CrawlerService.validate_urls; every filtered URL contains /ro/
+        return {
+            'invalid_start_urls': self.invalid_start_urls,
+            'missing_ro_pattern_urls': [],
+            'all_valid_start': len(self.invalid_start_urls) == 0,
+            'all_have_ro_pattern': True
+        }
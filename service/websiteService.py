@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from sqlalchemy import Integer
 
 from model import CrawledUrl
@@ -8,18 +10,29 @@ from model.website import Website
 class WebsiteService:
     def __init__(self,
                  websiteRepository,
+                 snapshotRepository=None,
                  ):
         self.__websiteRepository = websiteRepository
+        self.__snapshotRepository = snapshotRepository
+
+    def deleteEverythingFromDatabase(self, truncate: bool = True) -> None:
+        return self.__websiteRepository.deleteEverythingFromDatabase(truncate)
 
-    def deleteEverythingFromDatabase(self) -> None:
-        return self.__websiteRepository.deleteEverythingFromDatabase()
+    def purgeWebsite(self, websiteId: int) -> None:
+        self.__websiteRepository.purgeWebsite(websiteId)
 
     def getWebsiteById(self, websiteId: Integer) -> Website|None:
         return self.__websiteRepository.getWebsiteById(websiteId)
 
+    async def getWebsiteByIdAsync(self, websiteId: int) -> Website|None:
+        return await self.__websiteRepository.getWebsiteByIdAsync(websiteId)
+
     def getWebsiteByName(self, websiteName: str) -> Website|None:
         return self.__websiteRepository.getWebsiteByName(websiteName)
 
+    async def getWebsiteByNameAsync(self, websiteName: str) -> Website|None:
+        return await self.__websiteRepository.getWebsiteByNameAsync(websiteName)
+
     def createWebsite(self, website: Website) -> None:
         self.__websiteRepository.createWebsite(website)
 
@@ -29,3 +42,52 @@ class WebsiteService:
     def addCrawledWebsiteUrl(self, crawledUrl: CrawledUrl) -> None:
         self.__websiteRepository.addCrawledWebsiteUrl(crawledUrl)
 
+    def bulkAddCrawledWebsiteUrls(self, crawledUrls: list) -> None:
+        self.__websiteRepository.bulkAddCrawledWebsiteUrls(crawledUrls)
+
+    async def bulkAddCrawledWebsiteUrlsAsync(self, crawledUrls: list) -> None:
+        await self.__websiteRepository.bulkAddCrawledWebsiteUrlsAsync(crawledUrls)
+
+    def upsertProducts(self, products: list, batchSize: int = 500) -> list:
+        return self.__websiteRepository.upsertProducts(products, batchSize)
+
+    async def upsertProductsAsync(self, products: list, batchSize: int = 500) -> list:
+        return await self.__websiteRepository.upsertProductsAsync(products, batchSize)
+
+    def getProductHashes(self, websiteId: int) -> dict:
+        return self.__websiteRepository.getProductHashes(websiteId)
+
+    async def getProductHashesAsync(self, websiteId: int) -> dict:
+        return await self.__websiteRepository.getProductHashesAsync(websiteId)
+
+    def getCrawledUrlAddresses(self, websiteId: int) -> set:
+        return self.__websiteRepository.getCrawledUrlAddresses(websiteId)
+
+    async def getCrawledUrlAddressesAsync(self, websiteId: int) -> set:
+        return await self.__websiteRepository.getCrawledUrlAddressesAsync(websiteId)
+
+    def deleteProducts(self, productIds: list) -> None:
+        self.__websiteRepository.deleteProducts(productIds)
+
+    async def deleteProductsAsync(self, productIds: list) -> None:
+        await self.__websiteRepository.deleteProductsAsync(productIds)
+
+    def recordSnapshots(self, websiteName: str, products: list, capturedAt: datetime) -> int:
+        # Price history is optional, nothing is recorded without a snapshot repository
+        if self.__snapshotRepository is None:
+            return 0
+        return self.__snapshotRepository.recordSnapshots(websiteName, products, capturedAt)
+
+    async def recordSnapshotsAsync(self, websiteName: str, products: list, capturedAt: datetime) -> int:
+        if self.__snapshotRepository is None:
+            return 0
+        return await self.__snapshotRepository.recordSnapshotsAsync(websiteName, products, capturedAt)
+
+    def getLatestPrice(self, websiteName: str, productKey: str) -> float|None:
+        return self.__snapshotRepository.getLatestPrice(websiteName, productKey)
+
+    def getPriceAt(self, websiteName: str, productKey: str, at: datetime) -> float|None:
+        return self.__snapshotRepository.getPriceAt(websiteName, productKey, at)
+
+    def getPriceHistory(self, websiteName: str, productKey: str) -> list:
+        return self.__snapshotRepository.getPriceHistory(websiteName, productKey)